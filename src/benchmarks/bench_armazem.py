@@ -0,0 +1,164 @@
+import sqlite3
+import os
+import sys
+import random
+import tempfile
+import time
+
+# --- Início: Correção de Caminho (sys.path) ---
+CAMINHO_ATUAL = os.path.dirname(os.path.abspath(__file__))
+CAMINHO_SRC = os.path.dirname(CAMINHO_ATUAL)
+CAMINHO_BASE_PROJETO = os.path.dirname(CAMINHO_SRC)
+
+if CAMINHO_BASE_PROJETO not in sys.path:
+    sys.path.append(CAMINHO_BASE_PROJETO)
+
+try:
+    from src.pipeline.construtor_indice import criar_tabelas
+    from src.pipeline.armazem_documentos import EscritorArmazem, LeitorArmazem
+    from src.recuperacao.buscador import _enriquecer_resultados
+except ImportError as e:
+    print(f"Erro ao importar módulos: {e}")
+    sys.exit(1)
+# --- Fim: Correção de Caminho ---
+
+# --- Parâmetros do corpus sintético ---
+TOTAL_DOCS = 50_000
+PALAVRAS_POR_RESUMO = 180
+RESULTADOS_POR_BUSCA = 50
+TOTAL_BUSCAS = 200
+# --------------------------------------
+
+
+def _gerar_documentos():
+    """Gera (DocId, Título, Autor, Filiação, resumo) com vocabulário realista em tamanho."""
+    rng = random.Random(42)
+    vocabulario = [f"palavra{i}" for i in range(5000)] + ['futebol', 'estádios', 'segurança', 'torcida']
+    for doc_id in range(1, TOTAL_DOCS + 1):
+        resumo = " ".join(rng.choices(vocabulario, k=PALAVRAS_POR_RESUMO))
+        yield (doc_id, f"Título do documento {doc_id}", f"Autor {doc_id % 997}, Autor {doc_id % 313}",
+               f"Universidade {doc_id % 50}", resumo)
+
+
+def _construir_antes(caminho_db: str):
+    """Esquema anterior: o resumo original fica inline na tabela Documentos."""
+    conn = sqlite3.connect(caminho_db)
+    conn.execute('''
+    CREATE TABLE Documentos (
+        DocId INTEGER PRIMARY KEY,
+        Titulo TEXT NOT NULL,
+        Autor TEXT,
+        Filiacao TEXT,
+        TotalTermos INTEGER,
+        ResumoOriginal TEXT
+    );
+    ''')
+    conn.executemany(
+        "INSERT INTO Documentos (DocId, Titulo, Autor, Filiacao, TotalTermos, ResumoOriginal) VALUES (?, ?, ?, ?, ?, ?)",
+        ((d, t, a, f, PALAVRAS_POR_RESUMO, r) for d, t, a, f, r in _gerar_documentos())
+    )
+    conn.commit()
+    conn.close()
+
+
+def _construir_depois(caminho_db: str, caminho_dados: str, caminho_indice: str):
+    """Esquema novo: Documentos só com metadados e resumos no armazém comprimido."""
+    conn = sqlite3.connect(caminho_db)
+    criar_tabelas(conn)
+    with EscritorArmazem(caminho_dados, caminho_indice) as armazem:
+        for doc_id, titulo, autor, filiacao, resumo in _gerar_documentos():
+            conn.execute(
+                "INSERT INTO Documentos (DocId, Titulo, Autor, Filiacao, TotalTermos) VALUES (?, ?, ?, ?, ?)",
+                (doc_id, titulo, autor, filiacao, PALAVRAS_POR_RESUMO)
+            )
+            armazem.adicionar(doc_id, resumo)
+    conn.commit()
+    conn.close()
+
+
+def _paginas_documentos(caminho_db: str) -> int:
+    """Bytes ocupados pelas páginas da tabela Documentos (o que as buscas trazem ao cache)."""
+    conn = sqlite3.connect(caminho_db)
+    total = conn.execute("SELECT SUM(pgsize) FROM dbstat WHERE name = 'Documentos'").fetchone()[0]
+    conn.close()
+    return total
+
+
+def _medir_enriquecimento(caminho_db: str) -> float:
+    """Tempo médio (ms) de '_enriquecer_resultados' com conexão nova (cache do SQLite frio)."""
+    rng = random.Random(7)
+    inicio = time.perf_counter()
+    for _ in range(TOTAL_BUSCAS):
+        conn = sqlite3.connect(caminho_db)
+        resultados = [{'DocId': d, 'Score': 1.0} for d in rng.sample(range(1, TOTAL_DOCS + 1), RESULTADOS_POR_BUSCA)]
+        _enriquecer_resultados(resultados, conn)
+        conn.close()
+    return (time.perf_counter() - inicio) * 1000 / TOTAL_BUSCAS
+
+
+def _medir_varredura(caminho_db: str) -> float:
+    """Tempo (ms) da varredura usada por '_get_todos_docs' no modelo booleano."""
+    conn = sqlite3.connect(caminho_db)
+    inicio = time.perf_counter()
+    conn.execute("SELECT DocId FROM Documentos").fetchall()
+    tempo = (time.perf_counter() - inicio) * 1000
+    conn.close()
+    return tempo
+
+
+def _mb(total_bytes: int) -> str:
+    return f"{total_bytes / (1024 * 1024):.1f} MB"
+
+
+def executar_benchmark():
+    with tempfile.TemporaryDirectory() as pasta:
+        db_antes = os.path.join(pasta, 'antes.db')
+        db_depois = os.path.join(pasta, 'depois.db')
+        dados = os.path.join(pasta, 'documentos.bin')
+        indice = os.path.join(pasta, 'documentos.idx')
+
+        print(f"Gerando corpus sintético: {TOTAL_DOCS} docs, {PALAVRAS_POR_RESUMO} palavras por resumo...")
+        _construir_antes(db_antes)
+        _construir_depois(db_depois, dados, indice)
+
+        print(f"\n{'':<36}{'antes':>14}{'depois':>14}")
+        print(f"{'Tamanho do sri.db':<36}{_mb(os.path.getsize(db_antes)):>14}{_mb(os.path.getsize(db_depois)):>14}")
+        print(f"{'Armazém (documentos.bin + .idx)':<36}{'-':>14}"
+              f"{_mb(os.path.getsize(dados) + os.path.getsize(indice)):>14}")
+        print(f"{'Páginas da tabela Documentos':<36}{_mb(_paginas_documentos(db_antes)):>14}"
+              f"{_mb(_paginas_documentos(db_depois)):>14}")
+        print(f"{'Enriquecimento (ms / busca)':<36}{_medir_enriquecimento(db_antes):>14.2f}"
+              f"{_medir_enriquecimento(db_depois):>14.2f}")
+        print(f"{'Varredura de DocIds (ms)':<36}{_medir_varredura(db_antes):>14.2f}"
+              f"{_medir_varredura(db_depois):>14.2f}")
+
+        # Acesso ao texto: antes via SQLite, depois via armazém (mmap)
+        rng = random.Random(11)
+        amostra = rng.sample(range(1, TOTAL_DOCS + 1), 1000)
+        conn = sqlite3.connect(db_antes)
+        inicio = time.perf_counter()
+        for doc_id in amostra:
+            conn.execute("SELECT ResumoOriginal FROM Documentos WHERE DocId = ?", (doc_id,)).fetchone()
+        tempo_antes = (time.perf_counter() - inicio) * 1000 / len(amostra)
+        inicio = time.perf_counter()
+        textos_antes = [r for (r,) in conn.execute("SELECT ResumoOriginal FROM Documentos ORDER BY DocId ASC")]
+        varredura_antes = time.perf_counter() - inicio
+        conn.close()
+
+        with LeitorArmazem(dados, indice) as armazem:
+            inicio = time.perf_counter()
+            for doc_id in amostra:
+                armazem.ler(doc_id)
+            tempo_depois = (time.perf_counter() - inicio) * 1000 / len(amostra)
+            inicio = time.perf_counter()
+            textos_depois = [texto for _, texto in armazem.iterar()]
+            varredura_depois = time.perf_counter() - inicio
+
+        assert textos_antes == textos_depois, "Textos do armazém diferem dos originais"
+        print(f"{'Leitura aleatória do resumo (ms)':<36}{tempo_antes:>14.3f}{tempo_depois:>14.3f}")
+        print(f"{'Leitura sequencial de todos (s)':<36}{varredura_antes:>14.2f}{varredura_depois:>14.2f}")
+
+
+if __name__ == "__main__":
+    # python src/benchmarks/bench_armazem.py
+    executar_benchmark()
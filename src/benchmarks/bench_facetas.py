@@ -0,0 +1,162 @@
+import sqlite3
+import os
+import sys
+import random
+import itertools
+import time
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# --- Início: Correção de Caminho (sys.path) ---
+CAMINHO_ATUAL = os.path.dirname(os.path.abspath(__file__))
+CAMINHO_SRC = os.path.dirname(CAMINHO_ATUAL)
+CAMINHO_BASE_PROJETO = os.path.dirname(CAMINHO_SRC)
+
+if CAMINHO_BASE_PROJETO not in sys.path:
+    sys.path.append(CAMINHO_BASE_PROJETO)
+
+try:
+    from src.pipeline.construtor_indice import criar_tabelas
+    from src.pipeline.facetas import extrair_facetas, salvar_facetas, bitmap_para_docids
+    from src.recuperacao.modelo_booleano import executar_busca_booleana
+    from src.recuperacao.filtros import IndiceFacetas
+    from src.recuperacao import modelo_vetorial
+    from src.recuperacao.listas_campeas import construir_listas_campeas
+except ImportError as e:
+    print(f"Erro ao importar módulos: {e}")
+    sys.exit(1)
+# --- Fim: Correção de Caminho ---
+
+# --- Parâmetros do corpus sintético ---
+TOTAL_DOCS = 100_000
+TOTAL_AUTORES = 30_000      # faceta de alta cardinalidade
+TOTAL_FILIACOES = 300
+AUTORES_POR_DOC = 3
+PALAVRAS_RUIDO_POR_DOC = 20
+TOP_K = 10
+REPETICOES = 20
+# --------------------------------------
+
+
+def _gerar_corpus(conexao: sqlite3.Connection):
+    """
+    Popula um banco em memória com postings para termos frequentes e raros,
+    e com facetas de Autor (alta cardinalidade, distribuição de Zipf) e Filiação.
+    Retorna os textos sintéticos (os mesmos termos + ruído) para o modelo vetorial.
+    """
+    rng = random.Random(42)
+    pesos_acumulados = list(itertools.accumulate(1.0 / (i + 1) for i in range(TOTAL_AUTORES)))
+    autores = [f"Autor Sintetico {i}" for i in range(TOTAL_AUTORES)]
+    ruido = [f"ruido{i}" for i in range(5000)]
+
+    documentos_por_faceta, rotulos = {}, {}
+    postings = []
+    textos = []
+    for doc_id in range(1, TOTAL_DOCS + 1):
+        filiacao = rng.randrange(TOTAL_FILIACOES)
+        meta = {
+            'Autor': ", ".join(rng.choices(autores, cum_weights=pesos_acumulados, k=AUTORES_POR_DOC)),
+            'Filiacao': f"Universidade Sintetica {filiacao} (US{filiacao})",
+        }
+        conexao.execute(
+            "INSERT INTO Documentos (DocId, Titulo, Autor, Filiacao, TotalTermos) VALUES (?, ?, ?, ?, ?)",
+            (doc_id, f"Documento {doc_id}", meta['Autor'], meta['Filiacao'], 0)
+        )
+        for campo, valores in extrair_facetas(meta).items():
+            for valor, rotulo in valores:
+                documentos_por_faceta.setdefault((campo, valor), set()).add(doc_id)
+                rotulos_valor = rotulos.setdefault((campo, valor), [])
+                if rotulo not in rotulos_valor:
+                    rotulos_valor.append(rotulo)
+        # 'futebol' aparece em ~90% dos docs, 'torcida' em ~30%, 'arbitragem' em ~1%
+        termos = [termo for termo, chance in (('futebol', 0.9), ('torcida', 0.3), ('arbitragem', 0.01))
+                  if rng.random() < chance]
+        postings.extend((termo, doc_id, 1) for termo in termos)
+        textos.append(" ".join(termos + rng.choices(ruido, k=PALAVRAS_RUIDO_POR_DOC)))
+
+    conexao.executemany("INSERT INTO IndiceInvertido (Termo, DocId, TF) VALUES (?, ?, ?)", postings)
+    salvar_facetas(conexao, documentos_por_faceta, rotulos)
+    conexao.commit()
+    return textos
+
+
+def _medir(funcao, *args) -> float:
+    """Retorna o tempo médio (ms) de REPETICOES chamadas."""
+    inicio = time.perf_counter()
+    for _ in range(REPETICOES):
+        funcao(*args)
+    return (time.perf_counter() - inicio) * 1000 / REPETICOES
+
+
+def executar_benchmark():
+    print(f"Gerando corpus sintético: {TOTAL_DOCS} docs, {TOTAL_AUTORES} autores, {TOTAL_FILIACOES} filiações...")
+    conn = sqlite3.connect(':memory:')
+    criar_tabelas(conn)
+    textos = _gerar_corpus(conn)
+
+    inicio = time.perf_counter()
+    indice = IndiceFacetas(conn)
+    print(f"Índice de facetas carregado em {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+    filtros = {
+        'sem filtro': None,
+        'Autor (cauda)': {'Autor': ['Autor Sintetico 20000']},
+        'Autor (cabeça)': {'Autor': ['Autor Sintetico 0']},
+        'Autor OR x10': {'Autor': [f"Autor Sintetico {i}" for i in range(100, 110)]},
+        'Filiacao': {'Filiacao': ['US7']},
+        'Autor AND Filiacao': {'Autor': ['Autor Sintetico 0'], 'Filiacao': ['US7']},
+    }
+    consultas = ['futebol', 'futebol AND torcida', 'arbitragem OR torcida', 'torcida AND NOT futebol']
+
+    print("\nModelo booleano")
+    print(f"{'consulta':<24}{'filtro':<22}{'busca (ms)':>12}{'facetas (ms)':>14}{'resultados':>12}")
+    for consulta in consultas:
+        for nome, clausulas in filtros.items():
+            tempo_filtro = _medir(indice.bitmap_filtro, clausulas)
+            filtro = indice.bitmap_filtro(clausulas)
+            tempo_busca = _medir(executar_busca_booleana, consulta, conn, filtro) + tempo_filtro
+            doc_ids = executar_busca_booleana(consulta, conn, filtro)
+            # Conferência: o filtro equivale a intersectar o resultado sem filtro
+            if filtro is not None:
+                permitidos = set(bitmap_para_docids(filtro))
+                assert doc_ids == [d for d in executar_busca_booleana(consulta, conn) if d in permitidos]
+            tempo_facetas = _medir(indice.contar, doc_ids)
+            print(f"{consulta:<24}{nome:<22}{tempo_busca:>12.2f}{tempo_facetas:>14.2f}{len(doc_ids):>12}")
+
+    # Modelo vetorial sintético sobre os mesmos documentos
+    vetorizador = TfidfVectorizer()
+    matriz = vetorizador.fit_transform(textos)
+    modelo_vetorial.VETORIZADOR = vetorizador
+    modelo_vetorial.MATRIZ_TFIDF = matriz
+    modelo_vetorial.MAPA_DOCID = list(range(1, TOTAL_DOCS + 1))
+    modelo_vetorial.DOCID_POR_LINHA = np.asarray(modelo_vetorial.MAPA_DOCID, dtype=np.int64)
+    listas = construir_listas_campeas(matriz)
+    modelo_vetorial._get_matriz_csc()
+
+    print("\nModelo vetorial")
+    print(f"{'consulta':<24}{'filtro':<22}{'completa (ms)':>14}{f'top-{TOP_K} (ms)':>14}"
+          f"{'facetas (ms)':>14}{'resultados':>12}")
+    for consulta in ['futebol', 'futebol torcida', 'arbitragem torcida']:
+        for nome, clausulas in filtros.items():
+            filtro = indice.bitmap_filtro(clausulas)
+            modelo_vetorial.LISTAS_CAMPEAS = None
+            tempo_completa = _medir(modelo_vetorial.buscar_vetorial, consulta, filtro)
+            resultados = modelo_vetorial.buscar_vetorial(consulta, filtro)
+            modelo_vetorial.LISTAS_CAMPEAS = listas
+            tempo_top_k = _medir(modelo_vetorial.buscar_vetorial, consulta, filtro, TOP_K)
+            top_k = modelo_vetorial.buscar_vetorial(consulta, filtro, TOP_K)
+            assert top_k == resultados[:TOP_K], f"Top-{TOP_K} divergente para '{consulta}' ({nome})"
+            # Facetas de uma busca top-k: conjunto completo pelas postings + contagem
+            doc_ids = modelo_vetorial.buscar_docids_vetorial(consulta, filtro)
+            assert doc_ids.tolist() == sorted(doc_id for doc_id, _ in resultados), \
+                f"Conjunto de resultados divergente para '{consulta}' ({nome})"
+            tempo_facetas = _medir(lambda: indice.contar(modelo_vetorial.buscar_docids_vetorial(consulta, filtro)))
+            print(f"{consulta:<24}{nome:<22}{tempo_completa:>14.2f}{tempo_top_k:>14.2f}"
+                  f"{tempo_facetas:>14.2f}{len(resultados):>12}")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    # python src/benchmarks/bench_facetas.py
+    executar_benchmark()
@@ -0,0 +1,90 @@
+import os
+import sys
+import random
+import itertools
+import time
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# --- Início: Correção de Caminho (sys.path) ---
+CAMINHO_ATUAL = os.path.dirname(os.path.abspath(__file__))
+CAMINHO_SRC = os.path.dirname(CAMINHO_ATUAL)
+CAMINHO_BASE_PROJETO = os.path.dirname(CAMINHO_SRC)
+
+if CAMINHO_BASE_PROJETO not in sys.path:
+    sys.path.append(CAMINHO_BASE_PROJETO)
+
+try:
+    from src.recuperacao import modelo_vetorial
+    from src.recuperacao.listas_campeas import construir_listas_campeas, TAMANHO_LISTA_CAMPEA
+except ImportError as e:
+    print(f"Erro ao importar módulos: {e}")
+    sys.exit(1)
+# --- Fim: Correção de Caminho ---
+
+# --- Parâmetros do corpus sintético ---
+TOTAL_DOCS = 50_000
+TAMANHO_VOCABULARIO = 20_000
+TERMOS_POR_DOC = 120
+TOP_K = 10
+REPETICOES = 20
+# --------------------------------------
+
+TERMOS_CABECA = ['futebol', 'estadios', 'seguranca', 'torcida', 'violencia']
+
+
+def _gerar_corpus():
+    """Gera resumos sintéticos com frequência de termos seguindo a lei de Zipf."""
+    rng = random.Random(42)
+    vocabulario = TERMOS_CABECA + [f"termo{i}" for i in range(TAMANHO_VOCABULARIO - len(TERMOS_CABECA))]
+    pesos_acumulados = list(itertools.accumulate(1.0 / (i + 1) for i in range(TAMANHO_VOCABULARIO)))
+    return [
+        " ".join(rng.choices(vocabulario, cum_weights=pesos_acumulados, k=TERMOS_POR_DOC))
+        for _ in range(TOTAL_DOCS)
+    ]
+
+
+def _medir(query: str, listas) -> tuple:
+    """Executa a busca top-k REPETICOES vezes e retorna (ms por busca, resultados)."""
+    modelo_vetorial.LISTAS_CAMPEAS = listas
+    inicio = time.perf_counter()
+    for _ in range(REPETICOES):
+        resultados = modelo_vetorial.buscar_vetorial(query, top_k=TOP_K)
+    return (time.perf_counter() - inicio) * 1000 / REPETICOES, resultados
+
+
+def executar_benchmark():
+    print(f"Gerando corpus sintético: {TOTAL_DOCS} docs, vocabulário de {TAMANHO_VOCABULARIO} termos...")
+    resumos = _gerar_corpus()
+
+    vetorizador = TfidfVectorizer()
+    matriz = vetorizador.fit_transform(resumos)
+
+    inicio = time.perf_counter()
+    listas = construir_listas_campeas(matriz, TAMANHO_LISTA_CAMPEA)
+    print(f"Listas campeãs (R={TAMANHO_LISTA_CAMPEA}) construídas em {time.perf_counter() - inicio:.2f} s")
+
+    # Substitui o modelo carregado do disco pelo modelo sintético
+    modelo_vetorial.VETORIZADOR = vetorizador
+    modelo_vetorial.MATRIZ_TFIDF = matriz
+    modelo_vetorial.MAPA_DOCID = list(range(1, TOTAL_DOCS + 1))
+    modelo_vetorial.DOCID_POR_LINHA = np.asarray(modelo_vetorial.MAPA_DOCID, dtype=np.int64)
+    inicio = time.perf_counter()
+    modelo_vetorial._get_matriz_csc()
+    print(f"Cópia CSC (postings do passo completo) criada em {time.perf_counter() - inicio:.2f} s")
+
+    consultas = TERMOS_CABECA + ['futebol estadios', 'seguranca torcida', 'futebol termo500', 'termo3000 termo4000']
+
+    print(f"\n{'consulta':<24}{'exaustiva (ms)':>16}{'campeãs (ms)':>14}{'speedup':>10}{'idêntico':>10}")
+    for consulta in consultas:
+        tempo_exaustivo, esperado = _medir(consulta, None)
+        tempo_campeas, obtido = _medir(consulta, listas)
+        identico = 'sim' if obtido == esperado else 'NÃO'
+        print(f"{consulta:<24}{tempo_exaustivo:>16.2f}{tempo_campeas:>14.2f}"
+              f"{tempo_exaustivo / tempo_campeas:>9.1f}x{identico:>10}")
+        assert obtido == esperado, f"Top-{TOP_K} divergente para '{consulta}'"
+
+
+if __name__ == "__main__":
+    # python src/benchmarks/bench_listas_campeas.py
+    executar_benchmark()
@@ -0,0 +1,99 @@
+import os
+import sys
+import random
+import itertools
+import resource
+import subprocess
+import tempfile
+import time
+import joblib
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# --- Início: Correção de Caminho (sys.path) ---
+CAMINHO_ATUAL = os.path.dirname(os.path.abspath(__file__))
+CAMINHO_SRC = os.path.dirname(CAMINHO_ATUAL)
+CAMINHO_BASE_PROJETO = os.path.dirname(CAMINHO_SRC)
+
+if CAMINHO_BASE_PROJETO not in sys.path:
+    sys.path.append(CAMINHO_BASE_PROJETO)
+
+try:
+    from src.pipeline.processador import processar
+    from src.pipeline.armazem_documentos import EscritorArmazem, LeitorArmazem
+    from src.recuperacao.tfidf_incremental import treinar_tfidf_incremental
+    from src.recuperacao.listas_campeas import construir_listas_campeas
+except ImportError as e:
+    print(f"Erro ao importar módulos: {e}")
+    sys.exit(1)
+# --- Fim: Correção de Caminho ---
+
+# --- Parâmetros do corpus sintético ---
+TAMANHOS_CORPUS = [20_000, 80_000]
+TAMANHO_VOCABULARIO = 30_000
+PALAVRAS_POR_RESUMO = 150
+# --------------------------------------
+
+MODOS = ['fit_transform', 'incremental', 'hashing']
+
+
+def _gerar_armazem(pasta: str, total_docs: int):
+    """Grava um corpus sintético (vocabulário com distribuição de Zipf) num armazém."""
+    rng = random.Random(42)
+    vocabulario = [f"termo{i}" for i in range(TAMANHO_VOCABULARIO)]
+    pesos_acumulados = list(itertools.accumulate(1.0 / (i + 1) for i in range(TAMANHO_VOCABULARIO)))
+    with EscritorArmazem(os.path.join(pasta, 'documentos.bin'), os.path.join(pasta, 'documentos.idx')) as armazem:
+        for doc_id in range(1, total_docs + 1):
+            armazem.adicionar(doc_id, " ".join(rng.choices(vocabulario, cum_weights=pesos_acumulados,
+                                                            k=PALAVRAS_POR_RESUMO)))
+
+
+def _medir_modo(modo: str, pasta: str):
+    """
+    Executado num subprocesso: treina no modo pedido, monta as listas campeãs,
+    salva os artefatos e imprime 'segundos pico_MB'.
+    """
+    inicio = time.perf_counter()
+    with LeitorArmazem(os.path.join(pasta, 'documentos.bin'), os.path.join(pasta, 'documentos.idx')) as armazem, \
+            tempfile.TemporaryDirectory(dir=pasta) as pasta_saida:
+        doc_ids = armazem.doc_ids()
+        if modo == 'fit_transform':
+            # Comportamento anterior: todos os textos numa lista + fit_transform de uma vez,
+            # listas campeãs sobre a matriz em memória e a matriz salva com joblib
+            resumos = [armazem.ler(doc_id) for doc_id in doc_ids]
+            vetorizador = TfidfVectorizer(tokenizer=processar, lowercase=False, stop_words=None)
+            matriz = vetorizador.fit_transform(resumos)
+            listas = construir_listas_campeas(matriz)
+            joblib.dump(matriz, os.path.join(pasta_saida, 'tfidf_matrix.joblib'))
+        else:
+            vetorizador, matriz, listas = treinar_tfidf_incremental(
+                doc_ids, armazem.ler, processar, os.path.join(pasta_saida, 'tfidf_matrix'),
+                hashing=(modo == 'hashing')
+            )
+        joblib.dump(vetorizador, os.path.join(pasta_saida, 'vectorizer.joblib'))
+        joblib.dump(listas, os.path.join(pasta_saida, 'listas_campeas.joblib'))
+        del matriz
+    segundos = time.perf_counter() - inicio
+    # ru_maxrss é em KB no Linux
+    print(f"{segundos:.2f} {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f}")
+
+
+def executar_benchmark():
+    print(f"{'docs':>8}{'modo':>16}{'tempo (s)':>12}{'pico RSS (MB)':>16}")
+    for total_docs in TAMANHOS_CORPUS:
+        with tempfile.TemporaryDirectory() as pasta:
+            _gerar_armazem(pasta, total_docs)
+            for modo in MODOS:
+                saida = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--medir', modo, pasta],
+                    capture_output=True, text=True, check=True
+                ).stdout.strip().splitlines()[-1]
+                segundos, pico = saida.split()
+                print(f"{total_docs:>8}{modo:>16}{float(segundos):>12.2f}{float(pico):>16.1f}")
+
+
+if __name__ == "__main__":
+    # python src/benchmarks/bench_treinamento.py
+    if len(sys.argv) == 4 and sys.argv[1] == '--medir':
+        _medir_modo(sys.argv[2], sys.argv[3])
+    else:
+        executar_benchmark()
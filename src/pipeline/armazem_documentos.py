@@ -0,0 +1,211 @@
+import os
+import mmap
+import struct
+import zlib
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# -----------------------------------------------------------------
+# Armazém de Documentos (texto dos resumos fora do SQLite)
+# -----------------------------------------------------------------
+# Os resumos são gravados em blocos comprimidos com zlib num arquivo
+# append-only ('documentos.bin'). Um índice à parte ('documentos.idx')
+# guarda, para cada DocId, onde está o bloco e a posição do texto nele.
+# Assim a tabela 'Documentos' do SQLite guarda só metadados pequenos.
+#
+# O índice é um vetor de registros de tamanho fixo ordenado por DocId:
+# a leitura faz busca binária direto no mmap, sem montar um dicionário.
+# Durante a escrita os registros são só acrescentados; ao fechar, o
+# escritor reordena o índice (e descarta versões antigas de um DocId).
+#
+# Formato de um bloco (antes da compressão):
+#   <quantidade: uint32> <tamanhos: uint32 * quantidade> <textos utf-8>
+# Formato de um registro do índice:
+#   <DocId: uint32> <offset do bloco: uint64> <tamanho do bloco: uint32> <posição: uint32>
+# -----------------------------------------------------------------
+
+CAMINHO_BASE_PROJETO = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+CAMINHO_ARMAZEM = os.path.join(CAMINHO_BASE_PROJETO, 'data', 'documentos.bin')
+CAMINHO_ARMAZEM_INDICE = os.path.join(CAMINHO_BASE_PROJETO, 'data', 'documentos.idx')
+
+# Quantidade de texto (bytes, antes da compressão) acumulada por bloco
+TAMANHO_BLOCO = 16 * 1024
+NIVEL_COMPRESSAO = 6
+
+_REGISTRO_INDICE = struct.Struct('<IQII')
+_DTYPE_INDICE = np.dtype([('doc_id', '<u4'), ('offset', '<u8'), ('tamanho', '<u4'), ('posicao', '<u4')])
+_UINT32 = struct.Struct('<I')
+
+
+def remover_armazem(caminho_dados: str = CAMINHO_ARMAZEM, caminho_indice: str = CAMINHO_ARMAZEM_INDICE):
+    """Remove os arquivos do armazém (usado ao reconstruir o índice do zero)."""
+    for caminho in (caminho_dados, caminho_indice):
+        if os.path.exists(caminho):
+            os.remove(caminho)
+
+
+class EscritorArmazem:
+    """
+    Acrescenta documentos ao final do armazém.
+    Os textos são acumulados em memória até 'tamanho_bloco' e então
+    comprimidos e gravados como um bloco. Use com 'with' (ou chame 'fechar').
+    """
+
+    def __init__(self, caminho_dados: str = CAMINHO_ARMAZEM, caminho_indice: str = CAMINHO_ARMAZEM_INDICE,
+                 tamanho_bloco: int = TAMANHO_BLOCO):
+        self.tamanho_bloco = tamanho_bloco
+        self._caminho_indice = caminho_indice
+        self._dados = open(caminho_dados, 'ab')
+        self._indice = open(caminho_indice, 'ab')
+        self._pendentes: List[Tuple[int, bytes]] = []
+        self._bytes_pendentes = 0
+
+    def adicionar(self, doc_id: int, texto: str):
+        """Adiciona um documento. Se o DocId já existir, a versão nova prevalece."""
+        dados = texto.encode('utf-8')
+        self._pendentes.append((doc_id, dados))
+        self._bytes_pendentes += len(dados)
+        if self._bytes_pendentes >= self.tamanho_bloco:
+            self._descarregar()
+
+    def _descarregar(self):
+        """Comprime os documentos pendentes num bloco e grava bloco + índice."""
+        if not self._pendentes:
+            return
+        cabecalho = _UINT32.pack(len(self._pendentes)) + b''.join(
+            _UINT32.pack(len(dados)) for _, dados in self._pendentes
+        )
+        bloco = zlib.compress(cabecalho + b''.join(dados for _, dados in self._pendentes), NIVEL_COMPRESSAO)
+
+        offset = self._dados.tell()
+        self._dados.write(bloco)
+        self._indice.write(b''.join(
+            _REGISTRO_INDICE.pack(doc_id, offset, len(bloco), posicao)
+            for posicao, (doc_id, _) in enumerate(self._pendentes)
+        ))
+        self._pendentes = []
+        self._bytes_pendentes = 0
+
+    def _ordenar_indice(self):
+        """
+        Reescreve o índice em ordem de DocId, mantendo só o registro mais
+        recente de cada DocId (o último acrescentado).
+        """
+        registros = np.fromfile(self._caminho_indice, dtype=_DTYPE_INDICE)
+        ordem = np.argsort(registros['doc_id'], kind='stable')
+        registros = registros[ordem]
+        if len(registros):
+            ultimos = np.append(registros['doc_id'][1:] != registros['doc_id'][:-1], True)
+            registros = registros[ultimos]
+        caminho_temporario = self._caminho_indice + '.tmp'
+        registros.tofile(caminho_temporario)
+        os.replace(caminho_temporario, self._caminho_indice)
+
+    def fechar(self):
+        self._descarregar()
+        self._dados.close()
+        self._indice.close()
+        self._ordenar_indice()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.fechar()
+
+
+class LeitorArmazem:
+    """
+    Leitura do armazém: o índice via mmap e os blocos com seek + read (um
+    bloco lido não fica mapeado, então uma varredura completa não faz a
+    memória residente crescer com o tamanho do arquivo).
+    'ler' dá acesso aleatório por DocId (busca binária no índice); 'iterar'
+    percorre a coleção em ordem de DocId. Como o 'construtor_indice.py'
+    grava os documentos em ordem de DocId, os blocos também ficam nessa
+    ordem e cada bloco é descomprimido uma única vez.
+    """
+
+    def __init__(self, caminho_dados: str = CAMINHO_ARMAZEM, caminho_indice: str = CAMINHO_ARMAZEM_INDICE):
+        if not os.path.exists(caminho_dados) or not os.path.exists(caminho_indice):
+            raise FileNotFoundError(
+                f"Armazém de documentos não encontrado em '{caminho_dados}'. "
+                "Execute o 'construtor_indice.py' primeiro."
+            )
+        self._arquivo_indice = open(caminho_indice, 'rb')
+        tamanho_indice = os.fstat(self._arquivo_indice.fileno()).st_size
+        self._mmap_indice = mmap.mmap(self._arquivo_indice.fileno(), 0, access=mmap.ACCESS_READ) if tamanho_indice else None
+        self._total = tamanho_indice // _REGISTRO_INDICE.size
+
+        self._arquivo = open(caminho_dados, 'rb')
+        # Cache do último bloco descomprimido (leituras sequenciais caem no mesmo bloco)
+        self._bloco_offset: Optional[int] = None
+        self._bloco_textos: List[bytes] = []
+
+    def __len__(self) -> int:
+        return self._total
+
+    def __contains__(self, doc_id: int) -> bool:
+        return self._buscar_registro(doc_id) is not None
+
+    def _doc_id_na_posicao(self, i: int) -> int:
+        return _UINT32.unpack_from(self._mmap_indice, i * _REGISTRO_INDICE.size)[0]
+
+    def _buscar_registro(self, doc_id: int) -> Optional[Tuple[int, int, int]]:
+        """Busca binária pelo DocId no índice; retorna (offset, tamanho, posição) ou None."""
+        baixo, alto = 0, self._total
+        while baixo < alto:
+            meio = (baixo + alto) // 2
+            if self._doc_id_na_posicao(meio) < doc_id:
+                baixo = meio + 1
+            else:
+                alto = meio
+        if baixo == self._total or self._doc_id_na_posicao(baixo) != doc_id:
+            return None
+        return _REGISTRO_INDICE.unpack_from(self._mmap_indice, baixo * _REGISTRO_INDICE.size)[1:]
+
+    def doc_ids(self) -> List[int]:
+        """Lista ordenada de todos os DocIds do armazém."""
+        return [self._doc_id_na_posicao(i) for i in range(self._total)]
+
+    def _carregar_bloco(self, offset: int, tamanho: int) -> List[bytes]:
+        if offset != self._bloco_offset:
+            self._arquivo.seek(offset)
+            bruto = zlib.decompress(self._arquivo.read(tamanho))
+            quantidade = _UINT32.unpack_from(bruto, 0)[0]
+            tamanhos = struct.unpack_from(f'<{quantidade}I', bruto, 4)
+            inicio = 4 + 4 * quantidade
+            textos = []
+            for t in tamanhos:
+                textos.append(bruto[inicio:inicio + t])
+                inicio += t
+            self._bloco_offset, self._bloco_textos = offset, textos
+        return self._bloco_textos
+
+    def ler(self, doc_id: int) -> str:
+        """Retorna o texto original do documento (KeyError se não existir)."""
+        registro = self._buscar_registro(doc_id)
+        if registro is None:
+            raise KeyError(doc_id)
+        offset, tamanho, posicao = registro
+        return self._carregar_bloco(offset, tamanho)[posicao].decode('utf-8')
+
+    def iterar(self) -> Iterator[Tuple[int, str]]:
+        """Gera (DocId, texto) em ordem crescente de DocId, sem carregar tudo na memória."""
+        for i in range(self._total):
+            doc_id, offset, tamanho, posicao = _REGISTRO_INDICE.unpack_from(
+                self._mmap_indice, i * _REGISTRO_INDICE.size
+            )
+            yield doc_id, self._carregar_bloco(offset, tamanho)[posicao].decode('utf-8')
+
+    def fechar(self):
+        if self._mmap_indice is not None:
+            self._mmap_indice.close()
+        self._arquivo.close()
+        self._arquivo_indice.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.fechar()
@@ -20,12 +20,13 @@ CAMINHO_BASE_PROJETO = os.path.dirname(CAMINHO_SRC)
 if CAMINHO_BASE_PROJETO not in sys.path:
     sys.path.append(CAMINHO_BASE_PROJETO)
 
-# Agora podemos importar o 'processador' com segurança
+# Agora podemos importar os módulos do pipeline com segurança
 try:
     from src.pipeline.processador import processar
-except ImportError:
-    print("Erro: Não foi possível importar 'processador'.")
-    print("Certifique-se de que 'src/pipeline/processador.py' existe.")
+    from src.pipeline.facetas import criar_tabela_facetas, extrair_facetas, salvar_facetas
+    from src.pipeline.armazem_documentos import EscritorArmazem, remover_armazem, CAMINHO_ARMAZEM
+except ImportError as e:
+    print(f"Erro ao importar módulos do pipeline: {e}")
     sys.exit(1)
 # --- Fim: Correção de Caminho ---
 
@@ -44,14 +45,15 @@ def criar_tabelas(conexao: sqlite3.Connection):
     cursor = conexao.cursor()
     
     # Tabela 1: Tabela de Documentos
-    # <DocId, Título, Autor, Total de termos significativos> + Resumo Original
+    # <DocId, Título, Autor, Filiação, Total de termos significativos>
+    # O Resumo Original fica no armazém comprimido (armazem_documentos.py)
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS Documentos (
         DocId INTEGER PRIMARY KEY,
         Titulo TEXT NOT NULL,
         Autor TEXT,
-        TotalTermos INTEGER,
-        ResumoOriginal TEXT
+        Filiacao TEXT,
+        TotalTermos INTEGER
     );
     ''')
     
@@ -86,6 +88,9 @@ def criar_tabelas(conexao: sqlite3.Connection):
         Valor TEXT
     );
     ''')
+
+    # Tabela 5: Facetas (Autor / Filiação -> bitmap de DocIds)
+    criar_tabela_facetas(conexao)
     
     conexao.commit()
     print("Tabelas do banco de dados criadas com sucesso.")
@@ -116,23 +121,33 @@ def construir_indice():
     if os.path.exists(CAMINHO_DB):
         os.remove(CAMINHO_DB)
         print(f"Banco de dados antigo '{CAMINHO_DB}' removido.")
+    remover_armazem()
         
-    # 2. Conecta e cria as tabelas
+    # 2. Conecta e cria as tabelas (e abre o armazém de resumos)
     conn = sqlite3.connect(CAMINHO_DB)
     criar_tabelas(conn)
+    armazem = EscritorArmazem()
     
     # 3. Carrega os metadados
     documentos_meta = carregar_metadados()
     if not documentos_meta:
         print("Nenhum documento encontrado em 'metadata.json'. Encerrando.")
+        armazem.fechar()
         conn.close()
         return
 
+    # Processa em ordem de DocId: os blocos do armazém ficam nessa ordem, e a
+    # leitura sequencial (treinamento) descomprime cada bloco uma única vez
+    documentos_meta.sort(key=lambda doc_meta: doc_meta.get('DocId') or 0)
+
     # 4. Estruturas de dados temporárias para o Dicionário Global
     # {termo: count global}
     ocorrencias_totais_global = Counter()
     # {termo: [lista de DocIds onde aparece]}
     documentos_por_termo_global = {} 
+    # {(campo, valor normalizado): {DocIds}} e {(campo, valor): [rótulos originais]}
+    documentos_por_faceta = {}
+    rotulos_faceta = {}
     
     total_palavras_colecao = 0
     total_documentos = 0
@@ -144,6 +159,7 @@ def construir_indice():
         doc_id = doc_meta.get('DocId')
         titulo = doc_meta.get('Titulo')
         autor = doc_meta.get('Autor')
+        filiacao = doc_meta.get('Filiacao')
         
         if not doc_id or not titulo:
             print(f"AVISO: Documento com metadados incompletos. Pulando: {doc_meta}")
@@ -173,15 +189,24 @@ def construir_indice():
         ocorrencias_totais_global.update(tokens_limpos)
         for termo in tf_documento.keys():
             documentos_por_termo_global.setdefault(termo, set()).add(doc_id)
+
+        # 5d'. Acumula as facetas (autores separados, filiações normalizadas)
+        for campo, valores in extrair_facetas(doc_meta).items():
+            for valor, rotulo in valores:
+                documentos_por_faceta.setdefault((campo, valor), set()).add(doc_id)
+                rotulos_valor = rotulos_faceta.setdefault((campo, valor), [])
+                if rotulo not in rotulos_valor:
+                    rotulos_valor.append(rotulo)
             
         # 5e. Insere dados no Banco de Dados (Tabelas 'Documentos' e 'IndiceInvertido')
         cursor = conn.cursor()
         
-        # Insere na Tabela Documentos
+        # Insere na Tabela Documentos (só metadados) e o resumo no armazém
         cursor.execute(
-            "INSERT INTO Documentos (DocId, Titulo, Autor, TotalTermos, ResumoOriginal) VALUES (?, ?, ?, ?, ?)",
-            (doc_id, titulo, autor, total_termos_significativos, resumo_original)
+            "INSERT INTO Documentos (DocId, Titulo, Autor, Filiacao, TotalTermos) VALUES (?, ?, ?, ?, ?)",
+            (doc_id, titulo, autor, filiacao, total_termos_significativos)
         )
+        armazem.adicionar(doc_id, resumo_original)
         
         # Insere no Índice Invertido (TF de cada termo para este DocId)
         entradas_indice_invertido = [
@@ -208,6 +233,10 @@ def construir_indice():
     )
     print(f"Dicionário de Termos populado com {len(entradas_dicionario)} termos únicos.")
 
+    # 6b. Pós-Loop: Grava um bitmap de DocIds por valor de faceta
+    total_facetas = salvar_facetas(conn, documentos_por_faceta, rotulos_faceta)
+    print(f"Facetas populadas com {total_facetas} valores (Autor/Filiação).")
+
     # 7. Pós-Loop: Salva os Metadados da Coleção
     cursor.execute("INSERT INTO Metadados (Chave, Valor) VALUES (?, ?)", ('UltimoDocId', str(ultimo_doc_id)))
     cursor.execute("INSERT INTO Metadados (Chave, Valor) VALUES (?, ?)", ('TotalPalavras', str(total_palavras_colecao)))
@@ -215,8 +244,10 @@ def construir_indice():
     print("Metadados da coleção salvos.")
 
     # 8. Finaliza
+    armazem.fechar()
     conn.commit()
     conn.close()
+    print(f"Resumos salvos no armazém comprimido '{CAMINHO_ARMAZEM}'.")
     print(f"\n[SUCESSO] Índice construído e salvo em '{CAMINHO_DB}'.")
 
 
@@ -0,0 +1,300 @@
+import re
+import sqlite3
+from array import array
+import unicodedata
+from typing import Dict, Iterable, List, Set, Tuple
+
+import numpy as np
+
+# -----------------------------------------------------------------
+# Facetas (Autor / Filiação) indexadas como bitmaps de DocId
+# -----------------------------------------------------------------
+# Cada valor de faceta (ex: um autor) é representado por um bitmap em que
+# o bit 'DocId' está ligado se o documento possui aquele valor.
+# Usamos o 'int' do Python como bitmap: AND/OR/popcount são feitos em C
+# sobre palavras de máquina. As conversões DocIds <-> bitmap usam o
+# packbits/unpackbits do numpy, sem laços em Python.
+# Valores raros (ex: a maioria dos autores) são gravados como lista de
+# DocIds, que ocupa menos que um bitmap do tamanho da coleção inteira.
+# -----------------------------------------------------------------
+
+CAMPOS_FACETA = ('Autor', 'Filiacao')
+
+# Separadores de autores: vírgula e "&"
+_SEPARADORES_AUTOR = re.compile(r'\s*[,&]\s*')
+# Com ';' no campo (formato ABNT, "SILVA, J.; SOUZA, M.") a vírgula separa
+# sobrenome e iniciais, então só ';' e '&' separam autores
+_SEPARADORES_AUTOR_ABNT = re.compile(r'\s*[;&]\s*')
+# Iniciais ("J.", "J.P.", "J"): uma parte só com iniciais depois da vírgula
+# é o fim de um nome ABNT ("SILVA, J."), não outro autor
+_INICIAL = re.compile(r'(?:[^\W\d_]\.)+|[^\W\d_]')
+# Conjunções entre dois autores (minúsculas: "E." é uma inicial, não "e")
+_CONJUNCAO_AUTOR = re.compile(r'\s+(?:e|and)\s+')
+# Sigla entre parênteses no fim da filiação, ex: "... Catarina (UFSC)"
+_SIGLA_FILIACAO = re.compile(r'\(([^()]+)\)\s*$')
+
+
+def normalizar_valor(texto: str) -> str:
+    """
+    Normaliza um valor de faceta para servir de chave:
+    remove acentos, converte para minúsculas e colapsa espaços.
+    """
+    sem_acentos = unicodedata.normalize('NFKD', texto)
+    sem_acentos = ''.join(c for c in sem_acentos if not unicodedata.combining(c))
+    return ' '.join(sem_acentos.lower().split())
+
+
+def _dividir_conjuncao(trecho: str) -> List[str]:
+    """
+    Divide "Ana Lima e Rui Sousa" em dois autores, mas mantém sobrenomes
+    compostos como "Ana Costa e Lima": uma parte de uma só palavra depois
+    da conjunção é tratada como continuação do nome anterior.
+    """
+    nomes = []
+    for parte in _CONJUNCAO_AUTOR.split(trecho):
+        if nomes and len(parte.split()) == 1:
+            nomes[-1] = f"{nomes[-1]} e {parte}"
+        else:
+            nomes.append(parte)
+    return nomes
+
+
+def _so_iniciais(trecho: str) -> bool:
+    """True se o trecho tiver só iniciais, ex: "J." ou "J. P."."""
+    palavras = trecho.split()
+    return bool(palavras) and all(_INICIAL.fullmatch(palavra) for palavra in palavras)
+
+
+def dividir_autores(autores: str) -> List[Tuple[str, str]]:
+    """
+    Divide o campo 'Autor' do metadata.json em autores individuais.
+    Separa por ',', ';' e '&', e por " e " / " and " entre nomes completos.
+    Se o campo tiver ';', a vírgula não separa autores ("SILVA, J.; SOUZA, M.");
+    sem ';', iniciais depois da vírgula continuam o nome anterior ("SILVA, J.").
+    Retorna uma lista de tuplas (chave normalizada, nome original).
+    """
+    if not autores:
+        return []
+    trechos = []
+    if ';' in autores:
+        trechos = _SEPARADORES_AUTOR_ABNT.split(autores)
+    else:
+        for trecho in _SEPARADORES_AUTOR.split(autores):
+            if trechos and _so_iniciais(trecho):
+                trechos[-1] = f"{trechos[-1]}, {trecho}"
+            else:
+                trechos.append(trecho)
+    resultado = []
+    vistos = set()
+    for trecho in trechos:
+        for nome in _dividir_conjuncao(' '.join(trecho.split())):
+            chave = normalizar_valor(nome)
+            if chave and chave not in vistos:
+                vistos.add(chave)
+                resultado.append((chave, nome))
+    return resultado
+
+
+def normalizar_filiacoes(filiacao: str) -> List[Tuple[str, str]]:
+    """
+    Normaliza o campo 'Filiacao' (pode conter várias, separadas por ';').
+    Quando há uma sigla entre parênteses, ela vira a chave, para que
+    "Universidade Federal de Santa Catarina (UFSC)" e "UFSC" coincidam.
+    Retorna uma lista de tuplas (chave normalizada, rótulo original).
+    """
+    if not filiacao:
+        return []
+    resultado = []
+    vistos = set()
+    for parte in filiacao.split(';'):
+        rotulo = ' '.join(parte.split())
+        if not rotulo:
+            continue
+        sigla = _SIGLA_FILIACAO.search(rotulo)
+        chave = normalizar_valor(sigla.group(1) if sigla else rotulo)
+        if chave and chave not in vistos:
+            vistos.add(chave)
+            resultado.append((chave, rotulo))
+    return resultado
+
+
+def nome_sem_sigla(rotulo: str) -> str:
+    """
+    Nome normalizado de uma filiação sem a sigla final, ex:
+    "Universidade Federal de Santa Catarina (UFSC)" -> "universidade federal de santa catarina".
+    Retorna '' se o rótulo não tiver sigla.
+    """
+    sigla = _SIGLA_FILIACAO.search(rotulo)
+    if not sigla:
+        return ''
+    return normalizar_valor(rotulo[:sigla.start()])
+
+
+def extrair_facetas(doc_meta: Dict) -> Dict[str, List[Tuple[str, str]]]:
+    """Extrai os valores de faceta de um registro do metadata.json."""
+    return {
+        'Autor': dividir_autores(doc_meta.get('Autor') or ''),
+        'Filiacao': normalizar_filiacoes(doc_meta.get('Filiacao') or ''),
+    }
+
+
+# --- Operações com bitmaps ---
+
+def docids_para_bitmap(doc_ids: Iterable[int]) -> int:
+    """Constrói um bitmap (int) a partir de um iterável de DocIds."""
+    doc_ids = np.fromiter(doc_ids, dtype=np.int64)
+    if len(doc_ids) == 0:
+        return 0
+    bits = np.zeros(int(doc_ids.max()) + 1, dtype=np.uint8)
+    bits[doc_ids] = 1
+    return int.from_bytes(np.packbits(bits, bitorder='little').tobytes(), 'little')
+
+
+def bitmap_para_docids(bitmap: int) -> List[int]:
+    """Decodifica um bitmap (int) na lista ordenada de DocIds."""
+    bits = np.unpackbits(np.frombuffer(bitmap_para_bytes(bitmap), dtype=np.uint8), bitorder='little')
+    return np.flatnonzero(bits).tolist()
+
+
+def bitmap_para_bytes(bitmap: int) -> bytes:
+    """Serializa o bitmap para gravação como BLOB no SQLite."""
+    return bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')
+
+
+def bytes_para_bitmap(dados: bytes) -> int:
+    """Lê um bitmap gravado como BLOB no SQLite."""
+    return int.from_bytes(dados, 'little')
+
+
+def serializar_docids(doc_ids: Iterable[int]) -> bytes:
+    """
+    Serializa um conjunto de DocIds no formato mais compacto:
+    b'L' + lista de uint32 (valores raros) ou b'B' + bitmap (valores frequentes).
+    """
+    doc_ids = sorted(doc_ids)
+    lista = array('I', doc_ids)
+    tamanho_bitmap = doc_ids[-1] // 8 + 1 if doc_ids else 0
+    if len(doc_ids) * lista.itemsize <= tamanho_bitmap:
+        return b'L' + lista.tobytes()
+    return b'B' + bitmap_para_bytes(docids_para_bitmap(doc_ids))
+
+
+def desserializar_docids(dados: bytes):
+    """
+    Inverso de 'serializar_docids'.
+    Retorna uma lista ordenada de DocIds (formato 'L') ou um bitmap int (formato 'B').
+    """
+    if dados[:1] == b'L':
+        lista = array('I')
+        lista.frombytes(dados[1:])
+        return lista.tolist()
+    return bytes_para_bitmap(dados[1:])
+
+
+# --- Persistência ---
+
+def criar_tabela_facetas(conexao: sqlite3.Connection):
+    """
+    Cria as tabelas de facetas:
+    Facetas: <Campo, Valor normalizado, Rótulo original, Quantidade de docs, DocIds (bitmap ou lista)>
+    FacetasNomes: <Campo, Nome completo normalizado, Valor> (filiações indexadas pela sigla)
+    """
+    conexao.execute('''
+    CREATE TABLE IF NOT EXISTS Facetas (
+        Campo TEXT,
+        Valor TEXT,
+        Rotulo TEXT,
+        Contagem INTEGER,
+        Bitmap BLOB,
+        PRIMARY KEY (Campo, Valor)
+    );
+    ''')
+    conexao.execute('''
+    CREATE TABLE IF NOT EXISTS FacetasNomes (
+        Campo TEXT,
+        Nome TEXT,
+        Valor TEXT,
+        PRIMARY KEY (Campo, Nome, Valor)
+    );
+    ''')
+
+
+def salvar_facetas(conexao: sqlite3.Connection, docs_por_valor: Dict[Tuple[str, str], Set[int]],
+                   rotulos: Dict[Tuple[str, str], List[str]]):
+    """
+    Grava os DocIds de cada valor de faceta (ver 'serializar_docids').
+    'docs_por_valor' mapeia (Campo, Valor) -> conjunto de DocIds e 'rotulos'
+    mapeia (Campo, Valor) -> rótulos originais vistos (o primeiro é o exibido).
+    O nome completo de cada rótulo com sigla vai para 'FacetasNomes'.
+    """
+    entradas = []
+    nomes = set()
+    for (campo, valor), doc_ids in docs_por_valor.items():
+        rotulos_valor = rotulos.get((campo, valor)) or [valor]
+        entradas.append((campo, valor, rotulos_valor[0], len(doc_ids), serializar_docids(doc_ids)))
+        for rotulo in rotulos_valor:
+            nome = nome_sem_sigla(rotulo)
+            if nome and nome != valor:
+                nomes.add((campo, nome, valor))
+    conexao.executemany(
+        "INSERT INTO Facetas (Campo, Valor, Rotulo, Contagem, Bitmap) VALUES (?, ?, ?, ?, ?)",
+        entradas
+    )
+    conexao.executemany("INSERT INTO FacetasNomes (Campo, Nome, Valor) VALUES (?, ?, ?)", sorted(nomes))
+    return len(entradas)
+
+
+if __name__ == "__main__":
+
+    print("\n--- Testando o facetas.py ---")
+
+    def chaves_autores(texto):
+        return [chave for chave, _ in dividir_autores(texto)]
+
+    # Separadores de lista
+    assert chaves_autores("Ana Lima, Rui Sousa & Eva Reis") == \
+        ['ana lima', 'rui sousa', 'eva reis'], "Falha: separadores ',' e '&'"
+    assert chaves_autores("Ana Lima; Rui Sousa & Eva Reis") == \
+        ['ana lima', 'rui sousa', 'eva reis'], "Falha: separadores ';' e '&'"
+    assert chaves_autores("Ana Lima, Rui Sousa e Eva Reis") == ['ana lima', 'rui sousa', 'eva reis'], \
+        "Falha: ' e ' antes do último autor"
+    assert chaves_autores("Ana Lima and Rui Sousa") == ['ana lima', 'rui sousa'], "Falha: ' and '"
+    print("OK: Autores separados por vírgula, ';', '&', ' e ' e ' and '.")
+
+    # Iniciais não são conjunções
+    assert chaves_autores("Carlos E. Souza") == ['carlos e. souza'], "Falha: inicial 'E.' dividiu o nome"
+    assert chaves_autores("Carlos E Souza, Rui Sousa") == ['carlos e souza', 'rui sousa'], \
+        "Falha: inicial 'E' dividiu o nome"
+    print("OK: Iniciais mantidas.")
+
+    # Sobrenomes compostos com "e"
+    assert chaves_autores("Ana Costa e Lima") == ['ana costa e lima'], "Falha: sobrenome composto dividido"
+    assert chaves_autores("Ana Costa e Lima, Rui Sousa") == ['ana costa e lima', 'rui sousa'], \
+        "Falha: sobrenome composto numa lista"
+    assert chaves_autores("Rui Sousa e Ana Costa e Lima") == ['rui sousa', 'ana costa e lima'], \
+        "Falha: sobrenome composto no último autor"
+    print("OK: Sobrenomes compostos mantidos.")
+
+    # Formato ABNT: com ';' no campo, a vírgula separa sobrenome e iniciais
+    assert chaves_autores("SILVA, J.; SOUZA, M.") == ['silva, j.', 'souza, m.'], "Falha: formato ABNT"
+    assert chaves_autores("SILVA, J. & SOUZA, M.; LIMA, P.") == ['silva, j.', 'souza, m.', 'lima, p.'], \
+        "Falha: formato ABNT com '&'"
+    assert chaves_autores("SILVA, J.") == ['silva, j.'], "Falha: um autor ABNT sem ';'"
+    assert chaves_autores("SILVA, J. P. & SOUZA, M.") == ['silva, j. p.', 'souza, m.'], \
+        "Falha: formato ABNT com '&' e sem ';'"
+    print("OK: Formato ABNT (SOBRENOME, I.; SOBRENOME, M.).")
+
+    # Filiações: sigla como chave e nome completo à parte
+    assert normalizar_filiacoes("Universidade Federal de Santa Catarina (UFSC); USP") == \
+        [('ufsc', 'Universidade Federal de Santa Catarina (UFSC)'), ('usp', 'USP')], "Falha: filiações"
+    assert nome_sem_sigla("Universidade Federal de Santa Catarina (UFSC)") == \
+        'universidade federal de santa catarina', "Falha: nome sem sigla"
+    assert nome_sem_sigla("USP") == '', "Falha: rótulo sem sigla"
+    print("OK: Filiações normalizadas.")
+
+    # Bitmaps
+    assert bitmap_para_docids(docids_para_bitmap([3, 1, 64, 9])) == [1, 3, 9, 64], "Falha: bitmap"
+    assert desserializar_docids(serializar_docids([5000, 20])) == [20, 5000], "Falha: lista serializada"
+    assert bitmap_para_docids(desserializar_docids(serializar_docids(range(1, 200)))) == list(range(1, 200)), \
+        "Falha: bitmap serializado"
+    print("OK: Bitmaps e serialização.")
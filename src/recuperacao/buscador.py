@@ -1,7 +1,7 @@
 import sqlite3
 import os
 import sys
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 # --- Início: Correção de Caminho (sys.path) ---
 CAMINHO_ATUAL = os.path.dirname(os.path.abspath(__file__))
@@ -13,7 +13,8 @@ if CAMINHO_BASE_PROJETO not in sys.path:
 
 try:
     from src.recuperacao.modelo_booleano import executar_busca_booleana
-    from src.recuperacao.modelo_vetorial import buscar_vetorial
+    from src.recuperacao.modelo_vetorial import buscar_vetorial, buscar_docids_vetorial
+    from src.recuperacao.filtros import IndiceFacetas
 except ImportError as e:
     print(f"Erro ao importar módulos de recuperação: {e}")
     sys.exit(1)
@@ -21,9 +22,22 @@ except ImportError as e:
 
 CAMINHO_DB = os.path.join(CAMINHO_BASE_PROJETO, 'data', 'sri.db')
 
+# Cache do índice de facetas: (mtime do banco, IndiceFacetas)
+_CACHE_FACETAS = (None, None)
+
+
+def _get_indice_facetas(conexao: sqlite3.Connection) -> IndiceFacetas:
+    """Carrega os bitmaps de facetas uma vez e recarrega se o banco mudar."""
+    global _CACHE_FACETAS
+    mtime = os.path.getmtime(CAMINHO_DB)
+    if _CACHE_FACETAS[0] != mtime:
+        _CACHE_FACETAS = (mtime, IndiceFacetas(conexao))
+    return _CACHE_FACETAS[1]
+
+
 def _enriquecer_resultados(resultados: List[Dict[str, Any]], conexao: sqlite3.Connection) -> List[Dict[str, Any]]:
     """
-    Pega uma lista de resultados (com DocId) e adiciona Título e Autor
+    Pega uma lista de resultados (com DocId) e adiciona Título, Autor e Filiação
     buscando no banco de dados.
     """
     cursor = conexao.cursor()
@@ -32,66 +46,105 @@ def _enriquecer_resultados(resultados: List[Dict[str, Any]], conexao: sqlite3.Co
     for item in resultados:
         doc_id = item['DocId']
         cursor.execute(
-            "SELECT Titulo, Autor FROM Documentos WHERE DocId = ?",
+            "SELECT Titulo, Autor, Filiacao FROM Documentos WHERE DocId = ?",
             (doc_id,)
         )
         row = cursor.fetchone()
         if row:
             item['Titulo'] = row[0]
             item['Autor'] = row[1]
+            item['Filiacao'] = row[2]
             resultados_finais.append(item)
             
     return resultados_finais
 
 
-def buscar(query_bruta: str, modelo: str) -> List[Dict[str, Any]]:
+def buscar_com_facetas(query_bruta: str, modelo: str,
+                       filtros: Optional[Dict[str, List[str]]] = None,
+                       top_k: Optional[int] = None,
+                       contar_facetas: bool = True) -> Dict[str, Any]:
     """
-    Função principal de busca que será usada pela interface gráfica (Pessoa C).
-    
+    Busca com filtros de faceta e contagem de facetas no conjunto de resultados.
+
     Args:
-        query_bruta (str): A string de busca do usuário (ex: "redes AND seguranca").
+        query_bruta (str): A string de busca do usuário.
         modelo (str): "booleano" ou "vetorial".
-        
+        filtros (dict): Cláusulas de filtro, ex: {'Autor': ['Sandra Rolim Ensslin'],
+                        'Filiacao': ['UFSC']}. Valores do mesmo campo são
+                        combinados com OR; campos diferentes com AND.
+        top_k (int): Se informado, o modelo vetorial retorna só os k melhores
+                     (usa as listas campeãs). As facetas continuam contadas
+                     sobre todos os documentos que casam com a busca.
+        contar_facetas (bool): Se False, pula a contagem ('Facetas' vem vazio).
+
     Returns:
-        List[Dict[str, Any]]: Uma lista de dicionários, cada um contendo:
-                               {'DocId', 'Titulo', 'Autor', 'Score'}
+        Dict[str, Any]: {'Resultados': [...], 'Facetas': {campo: [{'Valor', 'Rotulo', 'Contagem'}]}}
     """
-    
+
     if not os.path.exists(CAMINHO_DB):
-        return [{"Erro": "Banco de dados não encontrado."}]
-        
+        return {'Resultados': [{"Erro": "Banco de dados não encontrado."}], 'Facetas': {}}
+
     conn = sqlite3.connect(CAMINHO_DB)
     resultados_com_score = []
-    
+
     try:
+        # 1. Filtros -> um único bitmap de DocIds (aplicado ANTES da busca)
+        indice_facetas = _get_indice_facetas(conn)
+        filtro = indice_facetas.bitmap_filtro(filtros)
+
         if modelo == 'booleano':
-            # 1. Executa a busca booleana
-            doc_ids = executar_busca_booleana(query_bruta, conn)
-            # 2. Atribui score 1.0 (relevância binária)
+            doc_ids = executar_busca_booleana(query_bruta, conn, filtro)
             resultados_com_score = [{'DocId': doc_id, 'Score': 1.0} for doc_id in doc_ids]
-        
+
         elif modelo == 'vetorial':
-            # 1. Executa a busca vetorial
-            # Retorna lista de (DocId, score)
-            resultados_tuplas = buscar_vetorial(query_bruta)
-            # 2. Converte para lista de dicionários
+            resultados_tuplas = buscar_vetorial(query_bruta, filtro, top_k)
             resultados_com_score = [{'DocId': doc_id, 'Score': score} for doc_id, score in resultados_tuplas]
-            
+
         else:
-            return [{"Erro": f"Modelo '{modelo}' desconhecido."}]
+            return {'Resultados': [{"Erro": f"Modelo '{modelo}' desconhecido."}], 'Facetas': {}}
+
+        # 2. Contagem de facetas sobre todos os documentos que casam com a busca
+        # (se pedida). Com top_k, os resultados são só os k melhores: o
+        # conjunto completo vem das postings dos termos da query
+        facetas = {}
+        if contar_facetas:
+            if modelo == 'vetorial' and top_k is not None:
+                doc_ids = buscar_docids_vetorial(query_bruta, filtro)
+            else:
+                doc_ids = [item['DocId'] for item in resultados_com_score]
+            facetas = indice_facetas.contar(doc_ids)
 
-        # 3. Adiciona Título e Autor aos resultados
+        # 3. Adiciona Título, Autor e Filiação aos resultados
         resultados_finais = _enriquecer_resultados(resultados_com_score, conn)
-        
-        return resultados_finais
-        
+
+        return {'Resultados': resultados_finais, 'Facetas': facetas}
+
     except Exception as e:
         print(f"Erro durante a busca: {e}")
-        return [{"Erro": str(e)}]
+        return {'Resultados': [{"Erro": str(e)}], 'Facetas': {}}
     finally:
         conn.close()
 
 
+def buscar(query_bruta: str, modelo: str,
+           filtros: Optional[Dict[str, List[str]]] = None,
+           top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Função principal de busca que será usada pela interface gráfica (Pessoa C).
+    
+    Args:
+        query_bruta (str): A string de busca do usuário (ex: "redes AND seguranca").
+        modelo (str): "booleano" ou "vetorial".
+        filtros (dict): Filtros de faceta opcionais (ver 'buscar_com_facetas').
+        top_k (int): Número máximo de resultados no modelo vetorial (opcional).
+        
+    Returns:
+        List[Dict[str, Any]]: Uma lista de dicionários, cada um contendo:
+                               {'DocId', 'Titulo', 'Autor', 'Filiacao', 'Score'}
+    """
+    return buscar_com_facetas(query_bruta, modelo, filtros, top_k, contar_facetas=False)['Resultados']
+
+
 # Bloco de teste
 if __name__ == "__main__":
     print("--- Testando o Buscador (API para Pessoa C) ---")
@@ -107,4 +160,11 @@ if __name__ == "__main__":
     print(f"\nBuscando (Booleano) por: '{query2}'")
     resultados_bool = buscar(query2, "booleano")
     for res in resultados_bool:
-        print(f"  {res.get('Titulo')} (DocId: {res.get('DocId')})")
\ No newline at end of file
+        print(f"  {res.get('Titulo')} (DocId: {res.get('DocId')})")
+
+    print(f"\nBuscando (Vetorial, filtrado por Filiação=UFSC) por: '{query1}'")
+    busca_facetada = buscar_com_facetas(query1, "vetorial", {'Filiacao': ['UFSC']})
+    for res in busca_facetada['Resultados'][:5]:
+        print(f"  [Score: {res.get('Score'):.4f}] {res.get('Titulo')} (DocId: {res.get('DocId')})")
+    for campo, valores in busca_facetada['Facetas'].items():
+        print(f"  Faceta {campo}: " + ", ".join(f"{v['Rotulo']} ({v['Contagem']})" for v in valores))
\ No newline at end of file
@@ -0,0 +1,151 @@
+import sqlite3
+import os
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# --- Início: Correção de Caminho (sys.path) ---
+CAMINHO_ATUAL = os.path.dirname(os.path.abspath(__file__))
+CAMINHO_SRC = os.path.dirname(CAMINHO_ATUAL)
+CAMINHO_BASE_PROJETO = os.path.dirname(CAMINHO_SRC)
+
+if CAMINHO_BASE_PROJETO not in sys.path:
+    sys.path.append(CAMINHO_BASE_PROJETO)
+
+try:
+    from src.pipeline.facetas import (
+        CAMPOS_FACETA, normalizar_valor, dividir_autores, normalizar_filiacoes,
+        desserializar_docids, docids_para_bitmap, bitmap_para_docids
+    )
+except ImportError as e:
+    print(f"Erro ao importar 'facetas': {e}")
+    sys.exit(1)
+# --- Fim: Correção de Caminho ---
+
+
+class IndiceFacetas:
+    """
+    Facetas carregadas em memória a partir da tabela 'Facetas'.
+    Valores frequentes ficam como bitmaps (int); valores raros como listas de
+    DocIds, convertidas em bitmap apenas quando usadas num filtro.
+    Para a contagem, cada valor recebe um número e cada DocId aponta para os
+    números dos seus valores (arrays no formato CSR).
+    Carregado uma vez e reutilizado entre buscas.
+    """
+
+    def __init__(self, conexao: sqlite3.Connection):
+        # {campo: {valor: bitmap}}, {campo: {valor: [DocIds]}} e {campo: {valor: rótulo}}
+        self.densos: Dict[str, Dict[str, int]] = {campo: {} for campo in CAMPOS_FACETA}
+        self.esparsos: Dict[str, Dict[str, List[int]]] = {campo: {} for campo in CAMPOS_FACETA}
+        self.rotulos: Dict[str, Dict[str, str]] = {campo: {} for campo in CAMPOS_FACETA}
+        # {campo: {nome completo normalizado: [valores]}} (filiações indexadas pela sigla)
+        self.nomes: Dict[str, Dict[str, List[str]]] = {campo: {} for campo in CAMPOS_FACETA}
+        # (campo, valor) de cada número de valor
+        self._valores: List[Tuple[str, str]] = []
+
+        docs_por_valor = []
+        cursor = conexao.cursor()
+        cursor.execute("SELECT Campo, Valor, Rotulo, Bitmap FROM Facetas")
+        for campo, valor, rotulo, dados in cursor.fetchall():
+            doc_ids = desserializar_docids(dados)
+            self.rotulos.setdefault(campo, {})[valor] = rotulo
+            if isinstance(doc_ids, int):
+                self.densos.setdefault(campo, {})[valor] = doc_ids
+                doc_ids = bitmap_para_docids(doc_ids)
+            else:
+                self.esparsos.setdefault(campo, {})[valor] = doc_ids
+            self._valores.append((campo, valor))
+            docs_por_valor.append(np.asarray(doc_ids, dtype=np.int64))
+        self._montar_valores_por_doc(docs_por_valor)
+
+        cursor.execute("SELECT Campo, Nome, Valor FROM FacetasNomes")
+        for campo, nome, valor in cursor.fetchall():
+            self.nomes.setdefault(campo, {}).setdefault(nome, []).append(valor)
+
+    def _montar_valores_por_doc(self, docs_por_valor: List[np.ndarray]):
+        """
+        Monta o CSR DocId -> números de valor: os valores do documento 'd' são
+        _valores_por_doc[_inicio_por_doc[d]:_inicio_por_doc[d + 1]].
+        """
+        campos = list(self.rotulos)
+        self._campo_por_valor = np.array([campos.index(campo) for campo, _ in self._valores], dtype=np.int32)
+        if docs_por_valor:
+            docs = np.concatenate(docs_por_valor)
+            numeros = np.repeat(np.arange(len(docs_por_valor), dtype=np.int32),
+                                [len(doc_ids) for doc_ids in docs_por_valor])
+        else:
+            docs, numeros = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int32)
+        self._valores_por_doc = numeros[np.argsort(docs, kind='stable')]
+        por_doc = np.bincount(docs, minlength=1)
+        self._inicio_por_doc = np.zeros(len(por_doc) + 1, dtype=np.int64)
+        np.cumsum(por_doc, out=self._inicio_por_doc[1:])
+
+    def _bitmap(self, campo: str, chave: str) -> int:
+        """Retorna o bitmap de DocIds de um valor de faceta (0 se não existir)."""
+        if chave in self.densos[campo]:
+            return self.densos[campo][chave]
+        return docids_para_bitmap(self.esparsos[campo].get(chave, ()))
+
+    def _chaves(self, campo: str, valor: str) -> List[str]:
+        """
+        Converte um valor digitado pelo usuário para a(s) chave(s) do índice,
+        com a mesma divisão/normalização usada na indexação.
+        """
+        if campo == 'Filiacao':
+            chaves = []
+            for chave, rotulo in normalizar_filiacoes(valor):
+                chaves.append(chave)
+                # Também aceita o nome completo de uma filiação indexada pela sigla
+                chaves.extend(self.nomes[campo].get(normalizar_valor(rotulo), ()))
+            return chaves
+        return [chave for chave, _ in dividir_autores(valor)]
+
+    def bitmap_filtro(self, filtros: Dict[str, List[str]]) -> Optional[int]:
+        """
+        Combina as cláusulas de filtro em um único bitmap de DocIds.
+        Valores do mesmo campo são combinados com OR; campos diferentes com AND.
+        Retorna None se não houver filtros.
+        """
+        resultado = None
+        for campo, valores in (filtros or {}).items():
+            if campo not in self.rotulos:
+                raise ValueError(f"Faceta '{campo}' desconhecida. Use uma de {list(CAMPOS_FACETA)}.")
+            if isinstance(valores, str):
+                valores = [valores]
+            if not valores:
+                continue
+            bitmap_campo = 0
+            for valor in valores:
+                for chave in self._chaves(campo, valor):
+                    bitmap_campo |= self._bitmap(campo, chave)
+            resultado = bitmap_campo if resultado is None else resultado & bitmap_campo
+        return resultado
+
+    def contar(self, doc_ids: Iterable[int], limite: int = 20) -> Dict[str, List[Dict]]:
+        """
+        Conta os valores de faceta no conjunto de resultados com um único
+        bincount sobre os números de valor dos documentos (ver '_montar_valores_por_doc').
+        Retorna {campo: [{'Valor', 'Rotulo', 'Contagem'}, ...]} ordenado por contagem.
+        """
+        doc_ids = np.asarray(doc_ids, dtype=np.int64)
+        doc_ids = doc_ids[(doc_ids >= 0) & (doc_ids < len(self._inicio_por_doc) - 1)]
+        inicios = self._inicio_por_doc[doc_ids]
+        tamanhos = self._inicio_por_doc[doc_ids + 1] - inicios
+        # Posições de todas as entradas dos documentos, sem laço em Python
+        deslocamentos = inicios - (np.cumsum(tamanhos) - tamanhos)
+        posicoes = np.arange(tamanhos.sum()) + np.repeat(deslocamentos, tamanhos)
+        contagens = np.bincount(self._valores_por_doc[posicoes], minlength=len(self._valores))
+
+        presentes = np.flatnonzero(contagens)
+        facetas = {campo: [] for campo in self.rotulos}
+        for indice_campo, campo in enumerate(facetas):
+            numeros = presentes[self._campo_por_valor[presentes] == indice_campo]
+            for numero in numeros[np.argsort(-contagens[numeros], kind='stable')[:limite]]:
+                valor = self._valores[numero][1]
+                facetas[campo].append({
+                    'Valor': valor,
+                    'Rotulo': self.rotulos[campo].get(valor, valor),
+                    'Contagem': int(contagens[numero]),
+                })
+        return facetas
@@ -0,0 +1,264 @@
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+from typing import Dict, Optional, Tuple
+
+# -----------------------------------------------------------------
+# Listas Campeãs (champion lists) para top-k rápido
+# -----------------------------------------------------------------
+# Para cada termo (coluna da matriz TF-IDF) guardamos as R linhas de maior
+# peso, ordenadas por impacto, e o maior peso entre as linhas restantes
+# (limite superior). Na consulta, um documento fora de todas as listas
+# campeãs tem score <= soma(q_t * limite_t), o que permite provar que o
+# top-k calculado só com as listas é exatamente o mesmo da busca completa.
+# Quando não dá para provar, recorremos às postings completas dos termos da
+# query (as colunas deles numa cópia CSC da matriz), e só os melhores são
+# repontuados.
+# -----------------------------------------------------------------
+
+TAMANHO_LISTA_CAMPEA = 100
+# Folga para diferenças de arredondamento entre o limite e o cosseno
+_EPSILON = 1e-9
+
+
+class AcumuladorListasCampeas:
+    """
+    Constrói as listas campeãs lote a lote, sem a matriz inteira na memória.
+    Os lotes (csr_matrix) devem chegar em ordem crescente de linha.
+
+    Guarda no máximo R entradas (linha, peso) por termo, mais o maior peso
+    já descartado de cada termo (o 'limite'). Entradas novas que não superam
+    a R-ésima de um termo com lista cheia vão direto para o limite; as demais
+    ficam pendentes até passarem de 'tamanho_buffer' e então são combinadas
+    com as já guardadas, em fatias de termos (memória limitada pela fatia).
+    """
+
+    def __init__(self, total_termos: int, r: int = TAMANHO_LISTA_CAMPEA,
+                 tamanho_buffer: int = 1 << 19, tamanho_fatia: int = 1 << 18):
+        self.r = r
+        self.tamanho_buffer = tamanho_buffer
+        self.tamanho_fatia = tamanho_fatia
+        self.limite = np.zeros(total_termos, dtype=np.float64)
+        # Peso da R-ésima entrada de cada termo com lista cheia (-1 enquanto incompleta)
+        self._corte = np.full(total_termos, -1.0)
+        # Entradas guardadas, ordenadas por (termo, peso decrescente, linha)
+        self._termos = np.zeros(0, dtype=np.int32)
+        self._linhas = np.zeros(0, dtype=np.int32)
+        self._pesos = np.zeros(0, dtype=np.float64)
+        # Entradas pendentes, em ordem de linha
+        self._pendentes = []
+        self._total_pendentes = 0
+        self._total_linhas = 0
+
+    def adicionar(self, lote):
+        """Acrescenta um lote de linhas (csr_matrix) logo após as anteriores."""
+        termos = lote.indices.astype(np.int32)
+        linhas = np.repeat(np.arange(self._total_linhas, self._total_linhas + lote.shape[0], dtype=np.int32),
+                           np.diff(lote.indptr))
+        pesos = np.asarray(lote.data, dtype=np.float64)
+        self._total_linhas += lote.shape[0]
+
+        # Linhas novas perdem o empate para as já vistas: peso <= corte fica fora da lista
+        fora = pesos <= self._corte[termos]
+        np.maximum.at(self.limite, termos[fora], pesos[fora])
+        dentro = ~fora
+        self._pendentes.append((termos[dentro], linhas[dentro], pesos[dentro]))
+        self._total_pendentes += int(dentro.sum())
+        if self._total_pendentes > self.tamanho_buffer:
+            self._compactar()
+
+    def _selecionar(self, termos: np.ndarray, linhas: np.ndarray, pesos: np.ndarray):
+        """
+        Ordena uma fatia por (termo, peso decrescente) e mantém as R primeiras de cada termo.
+        A ordenação é estável e a fatia chega em ordem de linha dentro de cada
+        termo (guardadas antes das pendentes), então o empate fica por linha.
+        """
+        ordem = np.lexsort((-pesos, termos))
+        termos, linhas, pesos = termos[ordem], linhas[ordem], pesos[ordem]
+        del ordem
+
+        # Posição de cada entrada dentro da lista do seu termo
+        inicio_termo = np.flatnonzero(np.r_[True, termos[1:] != termos[:-1]])
+        posicao = np.arange(len(termos)) - np.repeat(inicio_termo, np.diff(np.r_[inicio_termo, len(termos)]))
+
+        # A primeira entrada descartada de cada termo é a de maior peso entre as descartadas
+        descartada = posicao == self.r
+        self.limite[termos[descartada]] = np.maximum(self.limite[termos[descartada]], pesos[descartada])
+        ultima = posicao == self.r - 1
+        self._corte[termos[ultima]] = pesos[ultima]
+
+        mantidas = posicao < self.r
+        return termos[mantidas], linhas[mantidas], pesos[mantidas]
+
+    def _compactar(self):
+        """Combina as pendentes com as guardadas, fatia a fatia de termos."""
+        if not self._pendentes:
+            return
+        termos_p = np.concatenate([t for t, _, _ in self._pendentes])
+        linhas_p = np.concatenate([l for _, l, _ in self._pendentes])
+        pesos_p = np.concatenate([p for _, _, p in self._pendentes])
+        self._pendentes, self._total_pendentes = [], 0
+        ordem = np.argsort(termos_p, kind='stable')
+        termos_p, linhas_p, pesos_p = termos_p[ordem], linhas_p[ordem], pesos_p[ordem]
+        del ordem
+
+        # Fronteiras das fatias: termos que caem a cada 'tamanho_fatia' entradas guardadas
+        fronteiras = np.unique(self._termos[::self.tamanho_fatia])
+        fronteiras = np.r_[fronteiras[1:], len(self.limite)]
+        novas_t, novas_l, novas_p = [], [], []
+        inicio_g = inicio_p = 0
+        for fim_termo in fronteiras:
+            fim_g = np.searchsorted(self._termos, fim_termo)
+            fim_p = np.searchsorted(termos_p, fim_termo)
+            t, l, p = self._selecionar(
+                np.concatenate((self._termos[inicio_g:fim_g], termos_p[inicio_p:fim_p])),
+                np.concatenate((self._linhas[inicio_g:fim_g], linhas_p[inicio_p:fim_p])),
+                np.concatenate((self._pesos[inicio_g:fim_g], pesos_p[inicio_p:fim_p])),
+            )
+            novas_t.append(t)
+            novas_l.append(l)
+            novas_p.append(p)
+            inicio_g, inicio_p = fim_g, fim_p
+
+        self._termos = np.concatenate(novas_t)
+        self._linhas = np.concatenate(novas_l)
+        self._pesos = np.concatenate(novas_p)
+
+    def finalizar(self) -> Dict[str, np.ndarray]:
+        """
+        Retorna as listas campeãs no formato CSC:
+        {'inicio', 'linhas', 'limite', 'r'}; as linhas de cada termo estão em
+        ordem de peso decrescente.
+        """
+        self._compactar()
+        inicio = np.zeros(len(self.limite) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self._termos, minlength=len(self.limite)), out=inicio[1:])
+        return {
+            'inicio': inicio,
+            'linhas': self._linhas,
+            'limite': self.limite,
+            'r': self.r,
+        }
+
+
+def construir_listas_campeas(matriz_tfidf, r: int = TAMANHO_LISTA_CAMPEA,
+                             linhas_por_lote: int = 10000) -> Dict[str, np.ndarray]:
+    """
+    Pré-calcula as listas campeãs a partir da matriz TF-IDF (docs x termos),
+    percorrendo-a em fatias de linhas (ver 'AcumuladorListasCampeas').
+    """
+    acumulador = AcumuladorListasCampeas(matriz_tfidf.shape[1], r)
+    for inicio in range(0, matriz_tfidf.shape[0], linhas_por_lote):
+        acumulador.adicionar(matriz_tfidf[inicio:inicio + linhas_por_lote])
+    return acumulador.finalizar()
+
+
+def _repontuar(query_vetor, matriz_tfidf, candidatos: np.ndarray, score_minimo: float):
+    """Cosseno exato (o mesmo da busca completa) para os candidatos, em ordem de linha."""
+    if len(candidatos) == 0:
+        return candidatos, np.zeros(0)
+    scores = cosine_similarity(query_vetor, matriz_tfidf[candidatos])[0]
+    relevantes = scores > score_minimo
+    return candidatos[relevantes], scores[relevantes]
+
+
+def _estimar_scores(query_vetor, matriz_csc) -> Optional[np.ndarray]:
+    """
+    Score de cada linha somando só as postings (colunas de 'matriz_csc') dos
+    termos da query. As linhas da matriz já são normalizadas: a soma difere
+    do cosseno só por arredondamento. Retorna None se a query for vazia.
+    """
+    norma = np.sqrt(np.dot(query_vetor.data, query_vetor.data))
+    if norma == 0:
+        return None
+    postings = matriz_csc[:, query_vetor.indices].tocoo()
+    return np.bincount(postings.row, weights=postings.data * (query_vetor.data / norma)[postings.col],
+                       minlength=matriz_csc.shape[0])
+
+
+def buscar_top_k_campeas(query_vetor, matriz_tfidf, listas: Dict[str, np.ndarray], k: int,
+                         score_minimo: float,
+                         mascara: Optional[np.ndarray] = None) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Passo rápido sobre as listas campeãs.
+    Calcula o cosseno exato apenas para os documentos presentes nas listas
+    campeãs dos termos da query e verifica se o top-k está garantido.
+    'mascara' (booleana, uma posição por linha) restringe os candidatos.
+
+    Retorna (linhas, scores) dos candidatos com score > score_minimo, em ordem
+    crescente de linha, ou None se for preciso recorrer à busca completa.
+    """
+    termos = query_vetor.indices
+    if len(termos) == 0:
+        return None
+
+    # Limite superior do score de qualquer documento fora das listas campeãs
+    norma = np.sqrt(np.dot(query_vetor.data, query_vetor.data))
+    if norma == 0:
+        return None
+    pesos_query = query_vetor.data / norma
+    limite_fora = float(np.dot(pesos_query, listas['limite'][termos])) + _EPSILON
+
+    inicio = listas['inicio']
+    candidatos = np.unique(np.concatenate(
+        [listas['linhas'][inicio[t]:inicio[t + 1]] for t in termos]
+    ))
+    if mascara is not None:
+        candidatos = candidatos[mascara[candidatos]]
+
+    candidatos, scores = _repontuar(query_vetor, matriz_tfidf, candidatos, score_minimo)
+
+    # Caso 1: documentos fora das listas nunca passariam do score mínimo
+    if limite_fora <= score_minimo:
+        return candidatos, scores
+
+    # Caso 2: o k-ésimo melhor candidato supera estritamente qualquer documento de fora
+    if len(scores) >= k:
+        k_esimo = np.partition(scores, len(scores) - k)[len(scores) - k]
+        if k_esimo > limite_fora:
+            return candidatos, scores
+
+    return None
+
+
+def buscar_top_k_postings(query_vetor, matriz_tfidf, matriz_csc, k: int, score_minimo: float,
+                          mascara: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Passo completo (fallback) sobre as postings de todos os termos da query.
+    Soma as postings (colunas de 'matriz_csc', a mesma matriz em formato CSC)
+    só dos termos da query para estimar os scores; só os documentos que podem
+    estar no top-k são repontuados com o cosseno exato em 'matriz_tfidf'.
+
+    Retorna (linhas, scores) em ordem crescente de linha.
+    """
+    estimativa = _estimar_scores(query_vetor, matriz_csc)
+    if estimativa is None:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+
+    candidatos = np.flatnonzero(estimativa > score_minimo - _EPSILON)
+    if mascara is not None:
+        candidatos = candidatos[mascara[candidatos]]
+    if len(candidatos) > k:
+        valores = estimativa[candidatos]
+        k_esimo = np.partition(valores, len(valores) - k)[len(valores) - k]
+        candidatos = candidatos[valores >= k_esimo - 2 * _EPSILON]
+
+    return _repontuar(query_vetor, matriz_tfidf, candidatos, score_minimo)
+
+
+def linhas_acima_do_minimo(query_vetor, matriz_tfidf, matriz_csc, score_minimo: float,
+                           mascara: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Todas as linhas com score > score_minimo (as mesmas da busca completa),
+    sem calcular o cosseno da coleção inteira: usa a soma das postings dos
+    termos da query e só repontua as linhas perto do mínimo.
+    Retorna as linhas em ordem crescente.
+    """
+    estimativa = _estimar_scores(query_vetor, matriz_csc)
+    if estimativa is None:
+        return np.zeros(0, dtype=np.int64)
+    candidatos = np.flatnonzero(estimativa > score_minimo - _EPSILON)
+    if mascara is not None:
+        candidatos = candidatos[mascara[candidatos]]
+    certos = estimativa[candidatos] > score_minimo + _EPSILON
+    duvidosos, _ = _repontuar(query_vetor, matriz_tfidf, candidatos[~certos], score_minimo)
+    return np.union1d(candidatos[certos], duvidosos)
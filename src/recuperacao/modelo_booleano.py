@@ -2,7 +2,7 @@ import sqlite3
 import re
 import os
 import sys
-from typing import Set, List
+from typing import List, Optional
 
 # --- Início: Correção de Caminho (sys.path) ---
 CAMINHO_ATUAL = os.path.dirname(os.path.abspath(__file__))
@@ -14,34 +14,42 @@ if CAMINHO_BASE_PROJETO not in sys.path:
 
 try:
     from src.pipeline.processador import processar
-except ImportError:
-    print("Erro: Não foi possível importar 'processador'.")
+    from src.pipeline.facetas import bitmap_para_docids, docids_para_bitmap
+except ImportError as e:
+    print(f"Erro ao importar módulos do pipeline: {e}")
     sys.exit(1)
 # --- Fim: Correção de Caminho ---
 
 
-def _get_docs_por_termo(termo: str, cursor: sqlite3.Cursor) -> Set[int]:
-    """Busca no índice invertido todos os DocIds que contêm um termo."""
+def _get_docs_por_termo(termo: str, cursor: sqlite3.Cursor) -> int:
+    """Busca no índice invertido todos os DocIds que contêm um termo (como bitmap)."""
     cursor.execute(
         "SELECT DocId FROM IndiceInvertido WHERE Termo = ?",
         (termo,)
     )
-    # Usa set comprehension para criar o conjunto de DocIds
-    return {row[0] for row in cursor.fetchall()}
+    return docids_para_bitmap(row[0] for row in cursor.fetchall())
 
-def _get_todos_docs(cursor: sqlite3.Cursor) -> Set[int]:
-    """Retorna um conjunto com todos os DocIds da coleção."""
+def _get_todos_docs(cursor: sqlite3.Cursor) -> int:
+    """Retorna um bitmap com todos os DocIds da coleção."""
     cursor.execute("SELECT DocId FROM Documentos")
-    return {row[0] for row in cursor.fetchall()}
+    return docids_para_bitmap(row[0] for row in cursor.fetchall())
 
 
-def executar_busca_booleana(query_bruta: str, conexao: sqlite3.Connection) -> List[int]:
+def executar_busca_booleana(query_bruta: str, conexao: sqlite3.Connection,
+                            filtro: Optional[int] = None) -> List[int]:
     """
     Executa a busca booleana.
     Suporta operadores AND, OR, e NOT (case-insensitive).
     Exemplos: "termo1 AND termo2", "termo1 OR termo2", "termo1 AND NOT termo2"
+
+    Os conjuntos de DocIds são bitmaps (int): AND, OR e AND NOT viram
+    operações bit a bit. 'filtro' é um bitmap de DocIds (ver 'filtros.py');
+    quando informado, ele substitui a coleção inteira como universo da busca
+    e é aplicado com um único AND sobre as postings.
     """
     cursor = conexao.cursor()
+    if filtro is not None and not filtro:
+        return []
     
     # Parser simples. Divide a query por operadores, mantendo-os.
     # Ex: "redes AND NOT segurança" -> ['redes', 'AND', 'NOT', 'segurança']
@@ -73,15 +81,15 @@ def executar_busca_booleana(query_bruta: str, conexao: sqlite3.Connection) -> Li
         # Processa o termo e pega só o primeiro (ignora consultas multi-palavra sem operador)
         termos_processados.append(processar(termo_bruto)[0] if termo_bruto else "")
 
-    # --- Lógica de Conjuntos ---
+    # --- Lógica de Conjuntos (bitmaps) ---
     
     # Caso especial: "NOT termo1"
     if operadores and operadores[0] == 'NOT':
-        todos_docs = _get_todos_docs(cursor)
+        todos_docs = filtro if filtro is not None else _get_todos_docs(cursor)
         docs_termo = _get_docs_por_termo(termos_processados[1], cursor) # Pega o termo depois do NOT
-        resultado_final = todos_docs - docs_termo
+        resultado_final = todos_docs & ~docs_termo
         # (Ignora o resto da query por simplicidade)
-        return sorted(list(resultado_final))
+        return bitmap_para_docids(resultado_final)
 
     # Pega o conjunto de resultados do primeiro termo
     if not termos_processados[0]:
@@ -96,15 +104,19 @@ def executar_busca_booleana(query_bruta: str, conexao: sqlite3.Connection) -> Li
         docs_termo_seguinte = _get_docs_por_termo(termo_seguinte, cursor)
         
         if op == 'AND':
-            resultado_final = resultado_final.intersection(docs_termo_seguinte)
+            resultado_final &= docs_termo_seguinte
         elif op == 'OR':
-            resultado_final = resultado_final.union(docs_termo_seguinte)
+            resultado_final |= docs_termo_seguinte
         elif op == 'AND NOT':
-            resultado_final = resultado_final.difference(docs_termo_seguinte)
+            resultado_final &= ~docs_termo_seguinte
         elif op == 'NOT': # Trata "termo1 NOT termo2" como "termo1 AND NOT termo2"
-            resultado_final = resultado_final.difference(docs_termo_seguinte)
+            resultado_final &= ~docs_termo_seguinte
+
+    if filtro is not None:
+        resultado_final &= filtro
 
-    return sorted(list(resultado_final))
+    # A decodificação do bitmap já devolve os DocIds em ordem crescente
+    return bitmap_para_docids(resultado_final)
 
 # Bloco de teste
 if __name__ == "__main__":
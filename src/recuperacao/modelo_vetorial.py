@@ -1,8 +1,9 @@
 import os
 import sys
 import joblib
+import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
-from typing import List, Tuple
+from typing import List, Tuple, Optional
 
 # --- Início: Correção de Caminho (sys.path) ---
 CAMINHO_ATUAL = os.path.dirname(os.path.abspath(__file__))
@@ -11,31 +12,102 @@ CAMINHO_BASE_PROJETO = os.path.dirname(CAMINHO_SRC)
 
 if CAMINHO_BASE_PROJETO not in sys.path:
     sys.path.append(CAMINHO_BASE_PROJETO)
+
+try:
+    from src.recuperacao.listas_campeas import buscar_top_k_campeas, buscar_top_k_postings, linhas_acima_do_minimo
+    from src.recuperacao.tfidf_incremental import (
+        abrir_matriz_em_disco, abrir_postings_em_disco, pasta_versao_atual
+    )
+    from src.pipeline.facetas import bitmap_para_bytes
+except ImportError as e:
+    print(f"Erro ao importar módulos: {e}")
+    sys.exit(1)
 # --- Fim: Correção de Caminho ---
 
 # --- Caminhos para os arquivos de modelo ---
-CAMINHO_VETORIZADOR = os.path.join(CAMINHO_BASE_PROJETO, 'data', 'vectorizer.joblib')
-CAMINHO_MATRIZ_TFIDF = os.path.join(CAMINHO_BASE_PROJETO, 'data', 'tfidf_matrix.joblib')
-CAMINHO_MAPA_DOCID = os.path.join(CAMINHO_BASE_PROJETO, 'data', 'doc_id_map.joblib')
+# Pasta gravada pelo 'treinar_vetorizador.py': uma subpasta por treinamento
+# (matriz em arrays CSR + joblibs) e o arquivo 'ATUAL' com a versão em uso
+CAMINHO_MODELO = os.path.join(CAMINHO_BASE_PROJETO, 'data', 'modelo_vetorial')
+ARQUIVO_VETORIZADOR = 'vectorizer.joblib'
+ARQUIVO_MAPA_DOCID = 'doc_id_map.joblib'
+ARQUIVO_LISTAS_CAMPEAS = 'listas_campeas.joblib'
+# Formato antigo (tudo em joblibs soltos em 'data/'), usado só se nenhuma
+# versão foi publicada: esses arquivos sempre vêm do mesmo treinamento
+PASTA_MODELO_ANTIGO = os.path.join(CAMINHO_BASE_PROJETO, 'data')
+ARQUIVO_MATRIZ_TFIDF_ANTIGO = 'tfidf_matrix.joblib'
 # ---------------------------------------------
 
+# Score mínimo para um documento entrar nos resultados
+SCORE_MINIMO = 0.01
+
 # --- Carregamento dos Modelos (feito uma vez na importação) ---
+PASTA_VERSAO = pasta_versao_atual(CAMINHO_MODELO)
+PASTA_ARTEFATOS = PASTA_VERSAO if PASTA_VERSAO is not None else PASTA_MODELO_ANTIGO
 try:
-    VETORIZADOR = joblib.load(CAMINHO_VETORIZADOR)
-    MATRIZ_TFIDF = joblib.load(CAMINHO_MATRIZ_TFIDF)
-    MAPA_DOCID = joblib.load(CAMINHO_MAPA_DOCID)
+    VETORIZADOR = joblib.load(os.path.join(PASTA_ARTEFATOS, ARQUIVO_VETORIZADOR))
+    if PASTA_VERSAO is not None:
+        MATRIZ_TFIDF = abrir_matriz_em_disco(PASTA_VERSAO)
+    else:
+        MATRIZ_TFIDF = joblib.load(os.path.join(PASTA_MODELO_ANTIGO, ARQUIVO_MATRIZ_TFIDF_ANTIGO))
+    MAPA_DOCID = joblib.load(os.path.join(PASTA_ARTEFATOS, ARQUIVO_MAPA_DOCID))
+    # DocId de cada linha como array (usado para aplicar os filtros de faceta)
+    DOCID_POR_LINHA = np.asarray(MAPA_DOCID, dtype=np.int64)
     print("Modelo Vetorial (Vetorizador, Matriz, MapaDocId) carregado com sucesso.")
 except FileNotFoundError:
-    print(f"ERRO: Arquivos de modelo não encontrados na pasta 'data/'.")
+    print(f"ERRO: Arquivos de modelo não encontrados em '{PASTA_ARTEFATOS}'.")
     print("Execute o script 'src/recuperacao/treinar_vetorizador.py' primeiro.")
     VETORIZADOR, MATRIZ_TFIDF, MAPA_DOCID = None, None, None
+    DOCID_POR_LINHA = np.zeros(0, dtype=np.int64)
+
+# As listas campeãs são opcionais: sem elas a busca é sempre exaustiva
+try:
+    LISTAS_CAMPEAS = joblib.load(os.path.join(PASTA_ARTEFATOS, ARQUIVO_LISTAS_CAMPEAS))
+except FileNotFoundError:
+    print("AVISO: Listas campeãs não encontradas. A busca top-k será exaustiva.")
+    LISTAS_CAMPEAS = None
+
+# Cópia CSC da matriz (postings por termo) para o passo completo do top-k:
+# (matriz de origem, cópia CSC). O treinamento grava as postings ao lado da
+# matriz (abertas via memmap); sem elas (formato antigo) a cópia é criada
+# na memória no primeiro uso.
+_CACHE_CSC = (None, None)
+if PASTA_VERSAO is not None and MATRIZ_TFIDF is not None:
+    try:
+        _CACHE_CSC = (MATRIZ_TFIDF, abrir_postings_em_disco(PASTA_VERSAO))
+    except FileNotFoundError:
+        print("AVISO: Postings (CSC) não encontradas; serão montadas na memória se necessário.")
 # -------------------------------------------------------------
 
 
-def buscar_vetorial(query_bruta: str) -> List[Tuple[int, float]]:
+def _get_matriz_csc():
+    """Retorna a matriz TF-IDF em formato CSC (a gravada no treinamento ou convertida uma única vez)."""
+    global _CACHE_CSC
+    if _CACHE_CSC[0] is not MATRIZ_TFIDF:
+        _CACHE_CSC = (MATRIZ_TFIDF, MATRIZ_TFIDF.tocsc())
+    return _CACHE_CSC[1]
+
+
+def _mascara_filtro(filtro: int) -> np.ndarray:
+    """Converte um bitmap de DocIds numa máscara booleana sobre as linhas da matriz."""
+    bits = np.unpackbits(np.frombuffer(bitmap_para_bytes(filtro), dtype=np.uint8), bitorder='little')
+    mascara = np.zeros(len(DOCID_POR_LINHA), dtype=bool)
+    dentro = DOCID_POR_LINHA < len(bits)
+    mascara[dentro] = bits[DOCID_POR_LINHA[dentro]]
+    return mascara
+
+
+def buscar_vetorial(query_bruta: str, filtro: Optional[int] = None,
+                    top_k: Optional[int] = None) -> List[Tuple[int, float]]:
     """
     Executa a busca vetorial para uma query.
     Retorna uma lista de tuplas (DocId, Score) ordenada por relevância.
+
+    Se 'filtro' for informado (bitmap de DocIds, ver 'filtros.py'), os scores
+    das linhas fora do filtro são zerados por uma máscara booleana.
+
+    Se 'top_k' for informado, retorna apenas os k melhores. Nesse caso tenta
+    primeiro as listas campeãs e só pontua a coleção inteira quando não é
+    possível garantir o mesmo top-k da busca exaustiva.
     """
     if not VETORIZADOR:
         print("ERRO: Modelo vetorial não foi carregado.")
@@ -45,24 +117,60 @@ def buscar_vetorial(query_bruta: str) -> List[Tuple[int, float]]:
     # Usamos VETORIZADOR.transform() (NÃO fit_transform)
     # A query deve estar dentro de uma lista, pois 'transform' espera um iterável
     query_vetor = VETORIZADOR.transform([query_bruta])
+
+    mascara = None
+    if filtro is not None:
+        mascara = _mascara_filtro(filtro)
+        if not mascara.any():
+            return []
+
+    # 2a. Passo rápido: cosseno apenas para os docs das listas campeãs;
+    # se o top-k não estiver garantido, usa as postings completas dos termos
+    campeoes = None
+    if top_k is not None and LISTAS_CAMPEAS is not None:
+        campeoes = buscar_top_k_campeas(query_vetor, MATRIZ_TFIDF, LISTAS_CAMPEAS,
+                                        top_k, SCORE_MINIMO, mascara)
+        if campeoes is None:
+            campeoes = buscar_top_k_postings(query_vetor, MATRIZ_TFIDF, _get_matriz_csc(),
+                                             top_k, SCORE_MINIMO, mascara)
+
+    if campeoes is not None:
+        linhas, scores = campeoes
+    else:
+        # 2b. Busca completa: Calcula a Similaridade do Cosseno
+        # Compara o vetor da query (1xN) com a matriz de todos os docs (20xN)
+        similaridades = cosine_similarity(query_vetor, MATRIZ_TFIDF)
+
+        # 'similaridades' é uma matriz 2D (ex: [[0.1, 0.5, 0.0, ...]])
+        # Pegamos apenas a primeira (e única) linha de scores
+        scores = similaridades[0]
+        if mascara is not None:
+            scores = np.where(mascara, scores, 0.0)
+        # Filtra resultados com relevância mínima
+        linhas = np.flatnonzero(scores > SCORE_MINIMO)
+        scores = scores[linhas]
     
-    # 2. Calcula a Similaridade do Cosseno
-    # Compara o vetor da query (1xN) com a matriz de todos os docs (20xN)
-    similaridades = cosine_similarity(query_vetor, MATRIZ_TFIDF)
-    
-    # 'similaridades' é uma matriz 2D (ex: [[0.1, 0.5, 0.0, ...]])
-    # Pegamos apenas a primeira (e única) linha de scores
-    scores = similaridades[0]
-    
-    # 3. Combina DocIds com Scores
+    # 3. Ordena pelo score (do maior para o menor); empates mantêm a ordem das linhas
+    ordem = np.argsort(-scores, kind='stable')
+    if top_k is not None:
+        ordem = ordem[:top_k]
+
+    # 4. Combina DocIds com Scores
     # Usamos o MAPA_DOCID para mapear o índice (0, 1, 2...) para o DocId real (1, 2, 5...)
-    resultados = []
-    for i, score in enumerate(scores):
-        if score > 0.01: # Filtra resultados com relevância mínima
-            doc_id = MAPA_DOCID[i]
-            resultados.append((doc_id, score))
-            
-    # 4. Ordena os resultados pelo score (do maior para o menor)
-    resultados.sort(key=lambda item: item[1], reverse=True)
-    
-    return resultados
\ No newline at end of file
+    return [(MAPA_DOCID[linhas[i]], scores[i]) for i in ordem]
+
+
+def buscar_docids_vetorial(query_bruta: str, filtro: Optional[int] = None) -> np.ndarray:
+    """
+    DocIds de todos os documentos que a busca vetorial completa retornaria
+    (score > SCORE_MINIMO, dentro do 'filtro'), sem ordenar nem pontuar a
+    coleção inteira. Usado para contar facetas quando só o top-k é retornado.
+    """
+    if not VETORIZADOR:
+        print("ERRO: Modelo vetorial não foi carregado.")
+        return np.zeros(0, dtype=np.int64)
+
+    query_vetor = VETORIZADOR.transform([query_bruta])
+    mascara = _mascara_filtro(filtro) if filtro is not None else None
+    linhas = linhas_acima_do_minimo(query_vetor, MATRIZ_TFIDF, _get_matriz_csc(), SCORE_MINIMO, mascara)
+    return DOCID_POR_LINHA[linhas]
@@ -0,0 +1,407 @@
+import os
+import sys
+import json
+import shutil
+import sqlite3
+import time
+from collections import Counter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer, TfidfTransformer, TfidfVectorizer
+from sklearn.pipeline import Pipeline
+
+# --- Início: Correção de Caminho (sys.path) ---
+CAMINHO_ATUAL = os.path.dirname(os.path.abspath(__file__))
+CAMINHO_SRC = os.path.dirname(CAMINHO_ATUAL)
+CAMINHO_BASE_PROJETO = os.path.dirname(CAMINHO_SRC)
+
+if CAMINHO_BASE_PROJETO not in sys.path:
+    sys.path.append(CAMINHO_BASE_PROJETO)
+
+try:
+    from src.recuperacao.listas_campeas import AcumuladorListasCampeas, TAMANHO_LISTA_CAMPEA
+except ImportError as e:
+    print(f"Erro ao importar 'listas_campeas': {e}")
+    sys.exit(1)
+# --- Fim: Correção de Caminho ---
+
+# -----------------------------------------------------------------
+# Treinamento TF-IDF out-of-core (em lotes)
+# -----------------------------------------------------------------
+# Em vez de carregar todos os resumos e chamar 'fit_transform' de uma vez:
+#   1ª passada: percorre os documentos em lotes e calcula o DF de cada termo
+#               (ou reaproveita o DF já gravado em 'DicionarioTermos');
+#   2ª passada: vetoriza lote a lote e grava data/indices/indptr da matriz
+#               CSR direto em disco, sem manter a matriz inteira na memória.
+#               Esses arquivos são o próprio artefato carregado (via memmap)
+#               pelo modelo vetorial; as listas campeãs são montadas na mesma
+#               passada.
+# Cada treinamento grava tudo numa pasta de versão nova e só no final troca
+# o arquivo 'ATUAL' (ver 'publicar_versao'), que aponta para a versão em uso.
+# O resultado é idêntico ao do TfidfVectorizer padrão (smooth_idf, norma l2),
+# inclusive a ordem das colunas dentro de cada linha (ordem de primeira
+# aparição no corpus), que define a ordem da soma na normalização.
+# No modo 'hashing' não há vocabulário: os termos vão para colunas por hash.
+# -----------------------------------------------------------------
+
+TAMANHO_LOTE = 1000
+N_FEATURES_HASHING = 2 ** 20
+# Arquivo, na pasta do modelo, com o nome da versão em uso
+ARQUIVO_VERSAO_ATUAL = 'ATUAL'
+
+
+def iterar_lotes(doc_ids: List[int], ler_texto: Callable[[int], str],
+                 tamanho_lote: int = TAMANHO_LOTE) -> Iterator[List[str]]:
+    """Gera listas de até 'tamanho_lote' textos, na ordem de 'doc_ids'."""
+    for inicio in range(0, len(doc_ids), tamanho_lote):
+        yield [ler_texto(doc_id) for doc_id in doc_ids[inicio:inicio + tamanho_lote]]
+
+
+def calcular_idf(df: np.ndarray, total_documentos: int) -> np.ndarray:
+    """IDF suavizado, com as mesmas operações do TfidfTransformer: ln((1+n)/(1+df)) + 1."""
+    df = df.astype(np.float64) + 1.0
+    idf = np.full_like(df, fill_value=total_documentos + 1, dtype=np.float64)
+    idf /= df
+    np.log(idf, out=idf)
+    idf += 1.0
+    return idf
+
+
+# --- 1ª passada: vocabulário e DF ---
+
+def contar_df(lotes: Iterable[List[str]], tokenizer: Callable[[str], List[str]]) -> Tuple[Dict[str, int], np.ndarray, int, np.ndarray]:
+    """
+    Percorre os lotes e conta em quantos documentos cada termo aparece.
+    Retorna (vocabulário {termo: coluna} em ordem alfabética, DF por coluna,
+    total de documentos, ordem de primeira aparição de cada coluna).
+    """
+    df = Counter()
+    total_documentos = 0
+    for lote in lotes:
+        for texto in lote:
+            # dict.fromkeys mantém a ordem de aparição (o Counter também)
+            df.update(dict.fromkeys(tokenizer(texto), 1))
+            total_documentos += 1
+    return _vocabulario_ordenado(list(df.items()), total_documentos)
+
+
+def df_do_dicionario(conexao: sqlite3.Connection) -> Tuple[Dict[str, int], np.ndarray, int, np.ndarray]:
+    """
+    Reaproveita o DF gravado pelo 'construtor_indice.py' em 'DicionarioTermos'
+    (mesmo 'processar', logo o mesmo vocabulário), dispensando a 1ª passada.
+    A ordem de inserção (rowid) é a ordem de primeira aparição na indexação;
+    como o construtor processa os documentos em ordem de DocId (a ordem das
+    linhas da matriz), o resultado é idêntico ao de 'contar_df'. Um banco
+    gerado fora dessa ordem daria diferenças de arredondamento (~1e-16).
+    """
+    cursor = conexao.cursor()
+    cursor.execute("SELECT Termo, DF FROM DicionarioTermos ORDER BY rowid")
+    termos_df = cursor.fetchall()
+    cursor.execute("SELECT COUNT(*) FROM Documentos")
+    return _vocabulario_ordenado(termos_df, cursor.fetchone()[0])
+
+
+def _vocabulario_ordenado(termos_df: List[Tuple[str, int]], total_documentos: int):
+    """Recebe (termo, DF) em ordem de aparição e numera as colunas em ordem alfabética."""
+    ordenados = sorted(range(len(termos_df)), key=lambda i: termos_df[i][0])
+    vocabulario = {termos_df[i][0]: coluna for coluna, i in enumerate(ordenados)}
+    df = np.array([termos_df[i][1] for i in ordenados], dtype=np.int64)
+    ordem_aparicao = np.array(ordenados, dtype=np.int64)
+    return vocabulario, df, total_documentos, ordem_aparicao
+
+
+def contar_df_hashing(lotes: Iterable[List[str]], hashing: HashingVectorizer) -> Tuple[np.ndarray, int]:
+    """DF por coluna de hash (memória fixa: um contador por coluna)."""
+    df = np.zeros(hashing.n_features, dtype=np.int64)
+    total_documentos = 0
+    for lote in lotes:
+        contagens = hashing.transform(lote)
+        contagens.sum_duplicates()
+        df += np.bincount(contagens.indices, minlength=hashing.n_features)
+        total_documentos += contagens.shape[0]
+    return df, total_documentos
+
+
+# --- Vetorizadores já "treinados" a partir do DF ---
+
+def criar_vetorizador(vocabulario: Dict[str, int], df: np.ndarray, total_documentos: int,
+                      tokenizer: Callable[[str], List[str]]) -> TfidfVectorizer:
+    """Monta um TfidfVectorizer equivalente ao obtido com 'fit' no corpus inteiro."""
+    vetorizador = TfidfVectorizer(tokenizer=tokenizer, lowercase=False, stop_words=None)
+    vetorizador.vocabulary_ = vocabulario
+    vetorizador.fixed_vocabulary_ = False
+    vetorizador.idf_ = calcular_idf(df, total_documentos)
+    return vetorizador
+
+
+def _vetorizador_de_lotes(vocabulario: Dict[str, int], idf: np.ndarray, ordem_aparicao: np.ndarray,
+                          tokenizer: Callable[[str], List[str]]) -> Callable[[List[str]], sp.csr_matrix]:
+    """
+    Função lote -> matriz TF-IDF idêntica às linhas de 'fit_transform'.
+    Reordena as colunas de cada linha pela ordem de primeira aparição antes
+    da normalização l2, como acontece no 'fit' do scikit-learn.
+    """
+    contador = CountVectorizer(tokenizer=tokenizer, lowercase=False, vocabulary=vocabulario, token_pattern=None)
+    tfidf = TfidfTransformer()
+    tfidf.idf_ = idf
+
+    def vetorizar(lote: List[str]) -> sp.csr_matrix:
+        # Converte antes de reordenar: 'astype' reordenaria as colunas de volta
+        contagens = sp.csr_matrix(contador.transform(lote), dtype=np.float64)
+        linhas = np.repeat(np.arange(contagens.shape[0]), np.diff(contagens.indptr))
+        ordem = np.lexsort((ordem_aparicao[contagens.indices], linhas))
+        contagens.indices = contagens.indices[ordem]
+        contagens.data = contagens.data[ordem]
+        contagens.has_sorted_indices = False
+        return tfidf.transform(contagens, copy=False)
+
+    return vetorizar
+
+
+def criar_vetorizador_hashing(tokenizer: Callable[[str], List[str]],
+                              n_features: int = N_FEATURES_HASHING) -> HashingVectorizer:
+    """HashingVectorizer que produz contagens brutas (o TF-IDF é aplicado depois)."""
+    return HashingVectorizer(tokenizer=tokenizer, lowercase=False, n_features=n_features,
+                             alternate_sign=False, norm=None, token_pattern=None)
+
+
+def montar_pipeline_hashing(hashing: HashingVectorizer, df: np.ndarray, total_documentos: int) -> Pipeline:
+    """Pipeline hashing -> TF-IDF, usado na consulta no lugar do TfidfVectorizer."""
+    tfidf = TfidfTransformer()
+    tfidf.idf_ = calcular_idf(df, total_documentos)
+    return Pipeline([('hashing', hashing), ('tfidf', tfidf)])
+
+
+# --- 2ª passada: matriz CSR gravada em disco ---
+
+def escrever_matriz_em_disco(lotes: Iterable[List[str]], vetorizar: Callable[[List[str]], sp.csr_matrix],
+                             total_colunas: int, pasta: str,
+                             acumulador: Optional[AcumuladorListasCampeas] = None) -> sp.csr_matrix:
+    """
+    Vetoriza os lotes com 'vetorizar' e acrescenta data/indices/indptr em arquivos na 'pasta'
+    (mais 'forma.json'). A 'pasta' é criada aqui e não pode existir (ver 'criar_versao').
+    Cada lote também é entregue ao 'acumulador' das listas campeãs, se informado.
+    Retorna a matriz aberta com 'abrir_matriz_em_disco'.
+    """
+    os.makedirs(pasta)
+
+    total_linhas, total_nnz = 0, 0
+    with open(os.path.join(pasta, 'data.bin'), 'wb') as f_data, \
+            open(os.path.join(pasta, 'indices.bin'), 'wb') as f_indices, \
+            open(os.path.join(pasta, 'indptr.bin'), 'wb') as f_indptr:
+        np.zeros(1, dtype=np.int64).tofile(f_indptr)
+        for lote in lotes:
+            parcial = sp.csr_matrix(vetorizar(lote))
+            parcial.data.astype(np.float64, copy=False).tofile(f_data)
+            parcial.indices.astype(np.int32, copy=False).tofile(f_indices)
+            (parcial.indptr[1:].astype(np.int64) + total_nnz).tofile(f_indptr)
+            if acumulador is not None:
+                acumulador.adicionar(parcial)
+            total_linhas += parcial.shape[0]
+            total_nnz += parcial.nnz
+
+    with open(os.path.join(pasta, 'forma.json'), 'w', encoding='utf-8') as f:
+        json.dump({'linhas': total_linhas, 'colunas': total_colunas, 'nnz': total_nnz}, f)
+    return abrir_matriz_em_disco(pasta)
+
+
+# --- Versões do modelo ---
+
+def criar_versao(pasta_modelo: str) -> str:
+    """Retorna o caminho (ainda não criado) de uma nova pasta de versão dentro de 'pasta_modelo'."""
+    os.makedirs(pasta_modelo, exist_ok=True)
+    return os.path.join(pasta_modelo, f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}")
+
+
+def pasta_versao_atual(pasta_modelo: str) -> Optional[str]:
+    """Pasta da versão apontada por 'ATUAL', ou None se nenhum treinamento foi publicado."""
+    try:
+        with open(os.path.join(pasta_modelo, ARQUIVO_VERSAO_ATUAL), 'r', encoding='utf-8') as f:
+            versao = f.read().strip()
+    except FileNotFoundError:
+        return None
+    return os.path.join(pasta_modelo, versao)
+
+
+def publicar_versao(pasta_modelo: str, pasta_versao: str):
+    """
+    Passa a usar 'pasta_versao': grava o nome dela em 'ATUAL' com os.replace,
+    que troca o arquivo de uma vez (um treinamento interrompido antes daqui
+    deixa a versão anterior intacta). Depois tenta apagar as outras versões;
+    uma versão ainda aberta (memmap) por um processo no Windows não pode ser
+    apagada e fica para o próximo treinamento.
+    """
+    versao = os.path.basename(pasta_versao)
+    caminho_atual = os.path.join(pasta_modelo, ARQUIVO_VERSAO_ATUAL)
+    with open(caminho_atual + '.tmp', 'w', encoding='utf-8') as f:
+        f.write(versao)
+    os.replace(caminho_atual + '.tmp', caminho_atual)
+
+    for nome in os.listdir(pasta_modelo):
+        caminho = os.path.join(pasta_modelo, nome)
+        if nome != versao and os.path.isdir(caminho):
+            shutil.rmtree(caminho, ignore_errors=True)
+
+
+# Entrada da matriz nos arquivos temporários da transposição
+_DTYPE_ENTRADA = np.dtype([('coluna', '<i4'), ('linha', '<i4'), ('peso', '<f8')])
+
+
+def escrever_postings_em_disco(pasta: str, linhas_por_lote: int = 10000, entradas_por_bloco: int = 1 << 19):
+    """
+    Grava ao lado da matriz CSR da 'pasta' a mesma matriz em formato CSC
+    (postings de cada termo, com os documentos em ordem crescente), em
+    'postings_data.bin', 'postings_indices.bin' e 'postings_indptr.bin'.
+
+    A transposição não mapeia os arquivos na memória: as colunas são
+    divididas em blocos de ~'entradas_por_bloco' entradas; uma leitura
+    sequencial da CSR distribui as entradas em um arquivo temporário por
+    bloco, e cada bloco é então ordenado por coluna e acrescentado à saída.
+    A memória usada é a de um lote de linhas ou de um bloco.
+    """
+    forma = _ler_forma(pasta)
+    total_linhas, total_colunas, total_nnz = forma['linhas'], forma['colunas'], forma['nnz']
+    indptr_linhas = np.fromfile(os.path.join(pasta, 'indptr.bin'), dtype=np.int64)
+
+    # 1. Tamanho de cada posting e indptr da CSC
+    por_coluna = np.zeros(total_colunas, dtype=np.int64)
+    with open(os.path.join(pasta, 'indices.bin'), 'rb') as f_indices:
+        for _ in range(0, total_nnz, entradas_por_bloco):
+            por_coluna += np.bincount(np.fromfile(f_indices, dtype=np.int32, count=entradas_por_bloco),
+                                      minlength=total_colunas)
+    indptr = np.zeros(total_colunas + 1, dtype=np.int64)
+    np.cumsum(por_coluna, out=indptr[1:])
+    indptr.tofile(os.path.join(pasta, 'postings_indptr.bin'))
+    del por_coluna
+
+    # Bloco de cada coluna pela posição onde a posting começa na saída:
+    # blocos são faixas contíguas de colunas, na ordem da saída
+    bloco_da_coluna = indptr[:-1] // entradas_por_bloco
+
+    def caminho_bloco(bloco: int) -> str:
+        return os.path.join(pasta, f'postings_bloco{bloco}.tmp')
+
+    # 2. Distribui as entradas (em ordem de linha) nos arquivos dos blocos
+    blocos_usados = set()
+    with open(os.path.join(pasta, 'data.bin'), 'rb') as f_data, \
+            open(os.path.join(pasta, 'indices.bin'), 'rb') as f_indices:
+        for linha_inicio in range(0, total_linhas, linhas_por_lote):
+            linha_fim = min(linha_inicio + linhas_por_lote, total_linhas)
+            por_linha = np.diff(indptr_linhas[linha_inicio:linha_fim + 1])
+            tamanho = int(por_linha.sum())
+            entradas = np.empty(tamanho, dtype=_DTYPE_ENTRADA)
+            entradas['peso'] = np.fromfile(f_data, dtype=np.float64, count=tamanho)
+            entradas['coluna'] = np.fromfile(f_indices, dtype=np.int32, count=tamanho)
+            entradas['linha'] = np.repeat(np.arange(linha_inicio, linha_fim, dtype=np.int32), por_linha)
+            blocos = bloco_da_coluna[entradas['coluna']]
+            # Estável: dentro de cada bloco as entradas continuam em ordem de linha
+            ordem = np.argsort(blocos, kind='stable')
+            entradas, blocos = entradas[ordem], blocos[ordem]
+            inicios = np.flatnonzero(np.r_[True, np.diff(blocos) != 0]) if tamanho else []
+            for inicio, fim in zip(inicios, np.r_[inicios[1:], tamanho]):
+                bloco = int(blocos[inicio])
+                blocos_usados.add(bloco)
+                with open(caminho_bloco(bloco), 'ab') as f_bloco:
+                    entradas[inicio:fim].tofile(f_bloco)
+
+    # 3. Ordena cada bloco por coluna e grava na saída, bloco a bloco
+    with open(os.path.join(pasta, 'postings_data.bin'), 'wb') as f_data, \
+            open(os.path.join(pasta, 'postings_indices.bin'), 'wb') as f_indices:
+        for bloco in sorted(blocos_usados):
+            entradas = np.fromfile(caminho_bloco(bloco), dtype=_DTYPE_ENTRADA)
+            entradas = entradas[np.argsort(entradas['coluna'], kind='stable')]
+            entradas['peso'].tofile(f_data)
+            entradas['linha'].tofile(f_indices)
+            del entradas
+            os.remove(caminho_bloco(bloco))
+
+
+def _abrir_arrays(pasta: str, prefixo: str, total_ponteiros: int, total_nnz: int):
+    """Abre data/indices/indptr gravados na 'pasta' como np.memmap (somente leitura)."""
+    def _abrir(nome, dtype, tamanho):
+        if tamanho == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(os.path.join(pasta, prefixo + nome), dtype=dtype, mode='r', shape=(tamanho,))
+
+    data = _abrir('data.bin', np.float64, total_nnz)
+    indices = _abrir('indices.bin', np.int32, total_nnz)
+    indptr = _abrir('indptr.bin', np.int64, total_ponteiros)
+    if total_nnz < np.iinfo(np.int32).max:
+        # Mesmo tipo de índice do scikit-learn (copia só o indptr, 1 valor por linha/coluna)
+        indptr = np.asarray(indptr, dtype=np.int32)
+    return data, indices, indptr
+
+
+def _ler_forma(pasta: str) -> Dict[str, int]:
+    with open(os.path.join(pasta, 'forma.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def abrir_matriz_em_disco(pasta: str) -> sp.csr_matrix:
+    """
+    Abre a matriz gravada por 'escrever_matriz_em_disco' sem lê-la para a memória:
+    retorna uma csr_matrix cujos arrays são np.memmap dos arquivos da 'pasta'.
+    """
+    forma = _ler_forma(pasta)
+    arrays = _abrir_arrays(pasta, '', forma['linhas'] + 1, forma['nnz'])
+    return sp.csr_matrix(arrays, shape=(forma['linhas'], forma['colunas']), copy=False)
+
+
+def abrir_postings_em_disco(pasta: str) -> sp.csc_matrix:
+    """Como 'abrir_matriz_em_disco', para a cópia CSC gravada por 'escrever_postings_em_disco'."""
+    forma = _ler_forma(pasta)
+    arrays = _abrir_arrays(pasta, 'postings_', forma['colunas'] + 1, forma['nnz'])
+    return sp.csc_matrix(arrays, shape=(forma['linhas'], forma['colunas']), copy=False)
+
+
+def treinar_tfidf_incremental(doc_ids: List[int], ler_texto: Callable[[int], str],
+                              tokenizer: Callable[[str], List[str]], pasta_matriz: str,
+                              tamanho_lote: int = TAMANHO_LOTE, hashing: bool = False,
+                              conexao_dicionario: Optional[sqlite3.Connection] = None,
+                              tamanho_lista_campea: Optional[int] = TAMANHO_LISTA_CAMPEA):
+    """
+    Treina o modelo TF-IDF em duas passadas sobre os documentos, em lotes.
+
+    Args:
+        doc_ids: DocIds na ordem das linhas da matriz.
+        ler_texto: Função DocId -> texto (ex: LeitorArmazem.ler).
+        tokenizer: Tokenizador (nosso 'processar').
+        pasta_matriz: Pasta (nova) onde a matriz CSR e as postings (CSC) são gravadas;
+                      é o artefato final, ver 'abrir_matriz_em_disco' e 'abrir_postings_em_disco'.
+        hashing: Usa HashingVectorizer (sem vocabulário em memória).
+        conexao_dicionario: Se informada, lê o DF de 'DicionarioTermos' e pula a 1ª passada.
+        tamanho_lista_campea: R das listas campeãs montadas na 2ª passada (None: não monta).
+
+    Returns:
+        (vetorizador, matriz, listas_campeas): 'vetorizador.transform' vetoriza
+        consultas; 'matriz' é uma csr_matrix apoiada nos arquivos de 'pasta_matriz';
+        'listas_campeas' é None se 'tamanho_lista_campea' for None.
+    """
+    if hashing:
+        vetorizador_hashing = criar_vetorizador_hashing(tokenizer)
+        df, total_documentos = contar_df_hashing(iterar_lotes(doc_ids, ler_texto, tamanho_lote), vetorizador_hashing)
+        vetorizador = montar_pipeline_hashing(vetorizador_hashing, df, total_documentos)
+        vetorizar = vetorizador.transform
+        total_colunas = vetorizador_hashing.n_features
+    else:
+        if conexao_dicionario is not None:
+            vocabulario, df, total_documentos, ordem = df_do_dicionario(conexao_dicionario)
+        else:
+            vocabulario, df, total_documentos, ordem = contar_df(
+                iterar_lotes(doc_ids, ler_texto, tamanho_lote), tokenizer
+            )
+        vetorizador = criar_vetorizador(vocabulario, df, total_documentos, tokenizer)
+        vetorizar = _vetorizador_de_lotes(vocabulario, vetorizador.idf_, ordem, tokenizer)
+        total_colunas = len(vocabulario)
+
+    acumulador = None
+    if tamanho_lista_campea is not None:
+        acumulador = AcumuladorListasCampeas(total_colunas, tamanho_lista_campea)
+
+    matriz = escrever_matriz_em_disco(iterar_lotes(doc_ids, ler_texto, tamanho_lote),
+                                      vetorizar, total_colunas, pasta_matriz, acumulador)
+    escrever_postings_em_disco(pasta_matriz)
+    return vetorizador, matriz, acumulador.finalizar() if acumulador is not None else None
+
@@ -1,8 +1,8 @@
 import sqlite3
 import os
 import sys
+import argparse
 import joblib
-from sklearn.feature_extraction.text import TfidfVectorizer
 
 # --- Início: Correção de Caminho (sys.path) ---
 CAMINHO_ATUAL = os.path.dirname(os.path.abspath(__file__))
@@ -14,22 +14,40 @@ if CAMINHO_BASE_PROJETO not in sys.path:
 
 try:
     from src.pipeline.processador import processar
-except ImportError:
-    print("Erro: Não foi possível importar 'processador'.")
+    from src.recuperacao.listas_campeas import TAMANHO_LISTA_CAMPEA
+    from src.pipeline.armazem_documentos import LeitorArmazem
+    from src.recuperacao.tfidf_incremental import (
+        treinar_tfidf_incremental, criar_versao, publicar_versao, TAMANHO_LOTE
+    )
+except ImportError as e:
+    print(f"Erro ao importar módulos: {e}")
     sys.exit(1)
 # --- Fim: Correção de Caminho ---
 
 # --- Definição de Caminhos ---
 CAMINHO_DB = os.path.join(CAMINHO_BASE_PROJETO, 'data', 'sri.db')
-CAMINHO_VETORIZADOR = os.path.join(CAMINHO_BASE_PROJETO, 'data', 'vectorizer.joblib')
-CAMINHO_MATRIZ_TFIDF = os.path.join(CAMINHO_BASE_PROJETO, 'data', 'tfidf_matrix.joblib')
-CAMINHO_MAPA_DOCID = os.path.join(CAMINHO_BASE_PROJETO, 'data', 'doc_id_map.joblib')
+# Pasta do modelo: uma subpasta por treinamento (arrays CSR da matriz, forma.json
+# e os arquivos abaixo) e o arquivo 'ATUAL' com o nome da versão em uso
+CAMINHO_MODELO = os.path.join(CAMINHO_BASE_PROJETO, 'data', 'modelo_vetorial')
+ARQUIVO_VETORIZADOR = 'vectorizer.joblib'
+ARQUIVO_MAPA_DOCID = 'doc_id_map.joblib'
+ARQUIVO_LISTAS_CAMPEAS = 'listas_campeas.joblib'
 # -----------------------------
 
-def treinar_e_salvar_modelo():
+def treinar_e_salvar_modelo(tamanho_lote: int = TAMANHO_LOTE, hashing: bool = False,
+                            usar_dicionario: bool = False):
     """
-    Lê os resumos do banco de dados, treina o TfidfVectorizer e 
-    salva o vetorizador e a matriz TF-IDF em disco.
+    Lê os resumos do armazém de documentos em lotes, treina o modelo TF-IDF
+    e salva o vetorizador, a matriz TF-IDF e as listas campeãs em disco.
+
+    O treinamento é out-of-core (ver 'tfidf_incremental.py'): a memória usada
+    não depende do tamanho do corpus, só do lote e do vocabulário (e das
+    listas campeãs, no máximo R entradas por termo).
+
+    Args:
+        tamanho_lote (int): Quantidade de resumos lidos por vez.
+        hashing (bool): Usa HashingVectorizer (sem vocabulário em memória).
+        usar_dicionario (bool): Reaproveita o DF de 'DicionarioTermos' e pula a 1ª passada.
     """
     print("Iniciando treinamento do modelo vetorial...")
     
@@ -41,54 +59,56 @@ def treinar_e_salvar_modelo():
     conn = sqlite3.connect(CAMINHO_DB)
     cursor = conn.cursor()
     
-    # 1. Carrega todos os resumos e DocIds
+    # 1. Carrega os DocIds (a tabela Documentos só tem metadados)
     # É CRUCIAL manter a ordem entre resumos e DocIds
-    cursor.execute("SELECT DocId, ResumoOriginal FROM Documentos ORDER BY DocId ASC")
-    documentos = cursor.fetchall()
-    conn.close()
+    cursor.execute("SELECT DocId FROM Documentos ORDER BY DocId ASC")
+    doc_id_map = [row[0] for row in cursor.fetchall()]
     
-    if not documentos:
+    if not doc_id_map:
         print("ERRO: Nenhum documento encontrado no banco de dados.")
+        conn.close()
         return
-        
-    # Separa os DocIds e os textos dos resumos em listas ordenadas
-    doc_id_map = [doc[0] for doc in documentos]
-    resumos_originais = [doc[1] for doc in documentos]
-    
-    print(f"Carregados {len(resumos_originais)} resumos do banco de dados.")
 
-    # 2. Configura o Vetorizador
+    print(f"Treinando sobre {len(doc_id_map)} resumos do armazém de documentos "
+          f"(lotes de {tamanho_lote}, modo {'hashing' if hashing else 'vocabulário'}).")
+
+    # 2. Treina em duas passadas sobre o armazém
     # Usamos nosso 'processador.py' como o tokenizer!
-    # O Scikit-learn vai:
-    # 1. Pegar o resumo (string)
-    # 2. Entregar para 'processar'
-    # 3. Receber a lista de tokens limpos
-    # 4. Calcular o TF-IDF
-    vectorizer = TfidfVectorizer(
-        tokenizer=processar,  # Nossa função customizada
-        lowercase=False,      # Nosso 'processar' já faz isso
-        stop_words=None       # Nosso 'processar' já faz isso
-    )
+    # 1ª passada: DF de cada termo (ou DicionarioTermos, se 'usar_dicionario')
+    # 2ª passada: vetoriza cada lote, grava a matriz CSR direto na pasta da nova versão
+    #             e monta as listas campeãs (top-R docs por termo, por peso TF-IDF)
+    pasta_versao = criar_versao(CAMINHO_MODELO)
+    with LeitorArmazem() as armazem:
+        vectorizer, tfidf_matrix, listas_campeas = treinar_tfidf_incremental(
+            doc_id_map, armazem.ler, processar, pasta_versao,
+            tamanho_lote=tamanho_lote, hashing=hashing,
+            conexao_dicionario=conn if usar_dicionario and not hashing else None,
+            tamanho_lista_campea=TAMANHO_LISTA_CAMPEA
+        )
+    conn.close()
+    print(f"Matriz TF-IDF ({tfidf_matrix.shape[0]}x{tfidf_matrix.shape[1]}) salva em '{pasta_versao}'")
+    del tfidf_matrix
+
+    # 3. Salva os demais artefatos na mesma pasta usando joblib
+    joblib.dump(vectorizer, os.path.join(pasta_versao, ARQUIVO_VETORIZADOR))
+    joblib.dump(doc_id_map, os.path.join(pasta_versao, ARQUIVO_MAPA_DOCID))
+    joblib.dump(listas_campeas, os.path.join(pasta_versao, ARQUIVO_LISTAS_CAMPEAS))
+    print(f"Vetorizador, mapeamento de DocId e listas campeãs (R={TAMANHO_LISTA_CAMPEA}) salvos.")
+
+    # 4. Só agora a nova versão passa a ser a usada pelo modelo vetorial
+    publicar_versao(CAMINHO_MODELO, pasta_versao)
 
-    # 3. Treina o modelo e cria a matriz TF-IDF
-    print("Treinando o TfidfVectorizer e criando a matriz...")
-    tfidf_matrix = vectorizer.fit_transform(resumos_originais)
-    
-    # 4. Salva os artefatos em disco usando joblib
-    joblib.dump(vectorizer, CAMINHO_VETORIZADOR)
-    print(f"Vetorizador salvo em '{CAMINHO_VETORIZADOR}'")
-    
-    joblib.dump(tfidf_matrix, CAMINHO_MATRIZ_TFIDF)
-    print(f"Matriz TF-IDF salva em '{CAMINHO_MATRIZ_TFIDF}'")
-    
-    joblib.dump(doc_id_map, CAMINHO_MAPA_DOCID)
-    print(f"Mapeamento de DocId salvo em '{CAMINHO_MAPA_DOCID}'")
-    
     print("\n[SUCESSO] Treinamento do Modelo Vetorial concluído.")
-    print("Os arquivos de modelo foram gerados na pasta 'data/'.")
+    print(f"Os arquivos de modelo foram gerados em '{pasta_versao}'.")
 
 
 if __name__ == "__main__":
     # Para rodar este script, execute no terminal:
-    # python src/recuperacao/treinar_vetorizador.py
-    treinar_e_salvar_modelo()
\ No newline at end of file
+    # python src/recuperacao/treinar_vetorizador.py [--lote N] [--hashing] [--usar-dicionario]
+    parser = argparse.ArgumentParser(description="Treina o modelo vetorial (TF-IDF) em lotes.")
+    parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help="Resumos lidos por lote.")
+    parser.add_argument('--hashing', action='store_true', help="Usa HashingVectorizer (sem vocabulário).")
+    parser.add_argument('--usar-dicionario', action='store_true',
+                        help="Reaproveita o DF da tabela DicionarioTermos (pula a 1ª passada).")
+    args = parser.parse_args()
+    treinar_e_salvar_modelo(args.lote, args.hashing, args.usar_dicionario)